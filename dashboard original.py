@@ -275,8 +275,8 @@ def route_analytics_tab():
         st.error("AVL Tree not initialized.")
         return
 
-    # Reiniciar el árbol manualmente (no hay método clear)
-    avl.root = None
+    # Vaciar el árbol antes de volver a contar las rutas
+    avl.clear()
 
     # Contar frecuencia de rutas entre origen y destino
     route_freq = {}
@@ -11,9 +11,9 @@ import folium
 from streamlit_folium import st_folium
 
 from model.main import recibir_datos_simulacion_nx
-from model.graph import Graph
-from model.route_manager import RouteManager
+from model.nx_adapter import build_route_manager, graph_fingerprint
 from tda.avl import AVLTree
+from model.network_generator import generate_network
 
 mpl.rcParams['font.family'] = 'Segoe UI Emoji'
 
@@ -48,24 +48,6 @@ def generar_nombres_nodos(n):
                 return nombres
     return nombres[:n]
 
-def generar_arbol_aleatorio(n):
-    if n <= 1:
-        return []
-    prufer = [random.randint(0, n - 1) for _ in range(n - 2)]
-    grado = [1] * n
-    for nodo in prufer:
-        grado[nodo] += 1
-    aristas, hojas = [], sorted([i for i in range(n) if grado[i] == 1])
-    for nodo in prufer:
-        hoja = hojas.pop(0)
-        aristas.append((hoja, nodo))
-        grado[hoja] -= 1; grado[nodo] -= 1
-        if grado[nodo] == 1:
-            hojas.append(nodo); hojas.sort()
-    u, v = [i for i in range(n) if grado[i] == 1]
-    aristas.append((u, v))
-    return aristas
-
 def generar_coordenadas_temporalmente_validas(n):
     puntos = []
     while len(puntos) < n:
@@ -75,33 +57,14 @@ def generar_coordenadas_temporalmente_validas(n):
     return puntos
 
 def crear_grafo_con_roles(n_nodes, m_edges):
-    import itertools
     import random
     import networkx as nx
 
-    # Crear grafo completo con pesos aleatorios entre nodos
-    G_full = nx.Graph()
-    G_full.add_nodes_from(range(n_nodes))
-    for u, v in itertools.combinations(range(n_nodes), 2):
-        G_full.add_edge(u, v, weight=random.randint(1, 20))
-
-    # Obtener MST usando Kruskal (networkx usa Kruskal por defecto)
-    mst = nx.minimum_spanning_tree(G_full, algorithm='kruskal')
-
-    # Crear grafo G inicial con MST
+    # Grafo conexo con exactamente m_edges aristas: arbol aleatorio + aristas extra muestreadas
     G = nx.Graph()
     G.add_nodes_from(range(n_nodes))
-    for u, v, data in mst.edges(data=True):
-        G.add_edge(u, v, weight=data['weight'])
-
-    # Agregar aristas adicionales para alcanzar m_edges
-    posibles_aristas = set(G_full.edges()) - set(G.edges())
-    while G.number_of_edges() < m_edges and posibles_aristas:
-        arista = random.choice(list(posibles_aristas))
-        u, v = arista
-        peso = G_full[u][v]['weight']
-        G.add_edge(u, v, weight=peso)
-        posibles_aristas.remove(arista)
+    for u, v, w in generate_network(n_nodes, m_edges, weight_range=(1, 20)):
+        G.add_edge(u, v, weight=w)
 
     # Renombrar nodos con nombres tipo A, B, C, ...
     nombres = generar_nombres_nodos(n_nodes)
@@ -123,6 +86,16 @@ def crear_grafo_con_roles(n_nodes, m_edges):
     return G
 
 
+def obtener_route_manager(G):
+    """RouteManager del grafo G, construido una vez y cacheado en la sesion por su huella."""
+    fingerprint = graph_fingerprint(G)
+    cached = st.session_state.get('route_manager_cache')
+    if cached is None or cached[0] != fingerprint:
+        cached = (fingerprint, build_route_manager(G))
+        st.session_state['route_manager_cache'] = cached
+    return cached[1]
+
+
 def mostrar_mapa_grafo_folium(G):
     fmap = folium.Map(location=[-38.735, -72.607], zoom_start=14)
     for node in G.nodes():
@@ -179,17 +152,10 @@ def run_simulation_tab():
         almacenes = [n for n,d in G.nodes(data=True) if d['role']=="📦 Almacenamiento"]
         clientes_nodos = list(node_to_client.keys())
 
+        rm = obtener_route_manager(G)
         for _ in range(n_orders):
             origin = random.choice(almacenes)
             destination = random.choice(clientes_nodos)
-            graph = Graph(directed=False)
-            nm = {n: graph.insert_vertex(str(n)) for n in G.nodes()}
-            for u, v, data in G.edges(data=True):
-                graph.insert_edge(nm[u], nm[v], data.get("weight",1))
-            rm = RouteManager(graph)
-            for n, d in G.nodes(data=True):
-                if d['role']=="🔋 Recarga":
-                    rm.add_recharge_station(str(n))
             res = rm.find_route_with_recharge(str(origin), str(destination), battery_limit=100)
 
             client_obj = next(c for c in clients if c['client_id']==node_to_client[destination])
@@ -207,8 +173,10 @@ def run_simulation_tab():
                 "route_cost": res['total_cost']
             })
         st.session_state['orders'] = orders
-        recibir_datos_simulacion_nx(G, n_orders)
+        recibir_datos_simulacion_nx(G, n_orders, route_manager=rm)
         st.success(f"Simulation started: Nodes={n_nodes}, Edges={m_edges}, Orders={n_orders}")
+        info = rm.cache_info()
+        st.caption(f"Route cache: {info['hits']} hits, {info['misses']} misses, {info['evictions']} evictions")
 
 def explore_network_tab():
     st.header("🔍 Explore Network")
@@ -229,18 +197,17 @@ def explore_network_tab():
         if origin == destination:
             st.error("Origin and destination cannot be the same!")
         else:
-            graph = Graph(directed=False)
-            nm = {n: graph.insert_vertex(str(n)) for n in G.nodes()}
-            for u, v, data in G.edges(data=True):
-                graph.insert_edge(nm[u], nm[v], data.get("weight", 1))
-            rm = RouteManager(graph)
-            for n, d in G.nodes(data=True):
-                if d['role'] == "🔋 Recarga":
-                    rm.add_recharge_station(str(n))
-            res = rm.find_route_with_recharge(str(origin), str(destination), battery_limit=battery_limit)
-            st.session_state['last_route'] = {"origin": origin, "destination": destination, "result": res}
+            rm = obtener_route_manager(G)
+            # perfil para todo el rango del slider: moverlo despues es solo una consulta a la tabla
+            profile = rm.battery_profile(str(origin), str(destination), 10, 100)
+            st.session_state['last_route'] = {"origin": origin, "destination": destination, "profile": profile}
 
     last = st.session_state.get('last_route')
+    res = None
+    if last:
+        res = last['profile'].at(battery_limit)
+        if res is None:
+            st.error(f"No route with Battery Limit {battery_limit}")
 
     # Crear mapa base
     fmap = folium.Map(location=[-38.735, -72.607], zoom_start=14)
@@ -274,8 +241,8 @@ def explore_network_tab():
         ).add_to(fmap)
 
     # Si hay ruta calculada, destacarla
-    if last:
-        ori, dst, res = last['origin'], last['destination'], last['result']
+    if last and res is not None:
+        ori, dst = last['origin'], last['destination']
         st.success(f"Path: {' → '.join(res['path'])}")
         st.success(f"Total Cost: {res['total_cost']}")
         if res['recharge_stops']:
@@ -418,7 +385,7 @@ def route_analytics_tab():
     if avl is None:
         st.error("AVL Tree not initialized.")
         return
-    avl.root = None  # reset
+    avl.clear()  # reset (también el índice por frecuencia)
 
     route_freq = {}
     for order in st.session_state['orders']:
@@ -1,312 +1,29 @@
-import heapq
 import random
-from collections import deque, defaultdict
+from collections import defaultdict
 from datetime import datetime
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
+from queue import Queue, Empty, Full
+from threading import Thread, Event
+import json
 import sys
 import io
 
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
-
-# --------------------------
-#   Estructuras Basicas
-# --------------------------
-
-class Vertex:
-    """Lightweight vertex structure for a graph."""
-    __slots__ = '_element'
-
-    def __init__(self, element):
-        """Do not call constructor directly. Use Graph's insert_vertex(element)."""
-        self._element = element
-
-    def element(self):
-        """Return element associated with this vertex."""
-        return self._element
-
-    def __hash__(self):
-        return hash(id(self))
-
-    def __str__(self):
-        return str(self._element)
-
-    def __repr__(self):
-        return f"Vertex({self._element})"
-
-
-class Edge:
-    """Lightweight edge structure for a graph."""
-    __slots__ = '_origin', '_destination', '_element'
-
-    def __init__(self, u, v, x):
-        """Do not call constructor directly. Use Graph's insert_edge(u,v,x)."""
-        self._origin = u
-        self._destination = v
-        self._element = x
-
-    def endpoints(self):
-        """Return (u,v) tuple for vertices u and v."""
-        return (self._origin, self._destination)
-
-    def opposite(self, v):
-        """Return the vertex that is opposite v on this edge."""
-        return self._destination if v is self._origin else self._origin
-
-    def element(self):
-        """Return element associated with this edge."""
-        return self._element
-
-    def __hash__(self):
-        """Allow edge to be a map/set key."""
-        return hash((self._origin, self._destination))
-
-    def __str__(self):
-        """String representation of the edge."""
-        return f"({self._origin}->{self._destination}):{self._element}"
-
-    def __repr__(self):
-        """Official string representation."""
-        return f"Edge({self._origin}, {self._destination}, {self._element})"
-
-
-class Graph:
-    """Representation of a simple graph using an adjacency map."""
-    def __init__(self, directed=False):
-        """Create an empty graph (undirected, by default)."""
-        self._outgoing = {}
-        self._incoming = {} if directed else self._outgoing
-        self._directed = directed
-
-    def is_directed(self):
-        """Return True if this is a directed graph; False if undirected."""
-        return self._directed
-
-    def insert_vertex(self, element):
-        """Insert and return a new Vertex with element."""
-        v = Vertex(element)
-        self._outgoing[v] = {}
-        if self._directed:
-            self._incoming[v] = {}
-        return v
-
-    def insert_edge(self, u, v, element):
-        """Insert and return a new Edge from u to v with element."""
-        e = Edge(u, v, element)
-        self._outgoing[u][v] = e
-        self._incoming[v][u] = e
-        return e
-
-    def remove_edge(self, u, v):
-        """Remove the edge between u and v."""
-        if u in self._outgoing and v in self._outgoing[u]:
-            del self._outgoing[u][v]
-            del self._incoming[v][u]
-
-    def remove_vertex(self, v):
-        """Remove vertex v and all its incident edges."""
-        for u in list(self._outgoing.get(v, {})):
-            self.remove_edge(v, u)
-        for u in list(self._incoming.get(v, {})):
-            self.remove_edge(u, v)
-        self._outgoing.pop(v, None)
-        if self._directed:
-            self._incoming.pop(v, None)
-
-    def get_edge(self, u, v):
-        """Return the edge between u and v, or None if not adjacent."""
-        return self._outgoing.get(u, {}).get(v)
-
-    def vertices(self):
-        """Return an iteration of all vertices in the graph."""
-        return self._outgoing.keys()
-
-    def edges(self):
-        """Return a set of all edges in the graph."""
-        seen = set()
-        for map in self._outgoing.values():
-            seen.update(map.values())
-        return seen
-
-    def neighbors(self, v):
-        """Return an iteration over all neighbors of vertex v."""
-        return self._outgoing[v].keys()
-
-    def degree(self, v, outgoing=True):
-        """Return number of (outgoing) edges incident to vertex v."""
-        adj = self._outgoing if outgoing else self._incoming
-        return len(adj[v])
-
-    def incident_edges(self, v, outgoing=True):
-        """Return all (outgoing) edges incident to vertex v."""
-        adj = self._outgoing if outgoing else self._incoming
-        return adj[v].values()
+# Las estructuras de datos y el grafo se importan de los paquetes (una sola fuente)
+from model.graph import Graph
+from model.route_manager import RouteManager
+from model.geo import distance_scale, heuristic_to
+from tda.Hashmap import HashMap
+from tda.routes import NodeTable
+from tda.trie import RouteTrie, more_frequent
+from tda.aggregates import RouteAggregates
 
+sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
 
 # --------------------------
-#  Componentes del Sistema
+#   Arbol AVL de rutas
 # --------------------------
 
-class RouteManager:
-    """Gestiona rutas considerando estaciones de recarga."""
-    def __init__(self, graph):
-        self.graph = graph
-        self.recharge_stations = set()
-
-    def add_recharge_station(self, vertex_id):
-        """Registra una estacion de recarga."""
-        self.recharge_stations.add(vertex_id)
-
-    def find_route_with_recharge(self, origin_id, destination_id, battery_limit=50):
-        """
-        Encuentra la ruta optima considerando limitaciones de bateria.
-        
-        Returns:
-            dict: Contiene 'path', 'total_cost', 'recharge_stops', 'segments'
-        """
-        # Verificar y obtener vertices
-        origin = None
-        destination = None
-        vertices_map = {}
-        
-        for v in self.graph.vertices():
-            vertices_map[str(v.element())] = v
-            if str(v.element()) == str(origin_id):
-                origin = v
-            if str(v.element()) == str(destination_id):
-                destination = v
-                
-        if not origin or not destination:
-            raise ValueError("Vertice no encontrado, error con el origen y destino")
-            
-        # Caso especial: origen y destino iguales
-        if origin == destination:
-            return {
-                'path': [origin_id],
-                'total_cost': 0,
-                'recharge_stops': [],
-                'segments': [[origin_id]]
-            }
-            
-        # BFS modificado para considerar bateria
-        queue = deque()
-        queue.append((origin, [origin_id], battery_limit, 0, [], []))
-        
-        visited = {}  # {vertex_id: (remaining_battery, total_cost)}
-        best_solution = None
-        
-        while queue:
-            current_vertex, path, remaining_battery, total_cost, recharge_stops, segments = queue.popleft()
-            current_id = str(current_vertex.element())
-            
-            # Si llegamos al destino, guardar solucion si es mejor
-            if current_vertex == destination:
-                completed_segments = segments.copy()
-                if not completed_segments:
-                    completed_segments.append([origin_id, destination_id])
-                else:
-                    completed_segments[-1].append(destination_id)
-                    
-                if best_solution is None or total_cost < best_solution['total_cost']:
-                    best_solution = {
-                        'path': path,
-                        'total_cost': total_cost,
-                        'recharge_stops': recharge_stops,
-                        'segments': completed_segments
-                    }
-                continue
-                
-            # Verificar si ya visitamos este nodo con mejor o igual bateria y costo
-            if current_id in visited:
-                stored_battery, stored_cost = visited[current_id]
-                if stored_battery >= remaining_battery and stored_cost <= total_cost:
-                    continue
-            visited[current_id] = (remaining_battery, total_cost)
-            
-            # Explorar vecinos
-            for neighbor in self.graph.neighbors(current_vertex):
-                neighbor_id = str(neighbor.element())
-                edge = self.graph.get_edge(current_vertex, neighbor)
-                edge_cost = edge.element() if edge else 0
-                
-                is_recharge_station = neighbor_id in self.recharge_stations
-                
-                # Opcion 1: Ir al vecino sin recargar
-                if edge_cost <= remaining_battery:
-                    new_remaining = remaining_battery - edge_cost
-                    new_path = path + [neighbor_id]
-                    new_total_cost = total_cost + edge_cost
-                    new_recharge_stops = recharge_stops.copy()
-                    new_segments = segments.copy()
-                    
-                    if not new_segments:
-                        new_segments.append([origin_id, neighbor_id])
-                    else:
-                        if current_id not in new_segments[-1]:
-                            new_segments.append([current_id, neighbor_id])
-                        else:
-                            new_segments[-1].append(neighbor_id)
-                    
-                    queue.append((neighbor, new_path, new_remaining, new_total_cost, 
-                                new_recharge_stops, new_segments))
-                
-                # Opcion 2: Considerar recarga si es necesario o estamos en estacion
-                if edge_cost > remaining_battery or is_recharge_station:
-                    if current_id in self.recharge_stations and current_id not in recharge_stops:
-                        new_remaining = battery_limit
-                        new_path = path.copy()
-                        new_total_cost = total_cost
-                        new_recharge_stops = recharge_stops + [current_id]
-                        new_segments = segments.copy()
-                        
-                        queue.append((current_vertex, new_path, new_remaining, new_total_cost, 
-                                    new_recharge_stops, new_segments))
-                    else:
-                        # Buscar estacion de recarga mas cercana
-                        nearest_station = self._find_nearest_recharge_station(current_vertex, battery_limit)
-                        if nearest_station:
-                            station_id = str(nearest_station.element())
-                            new_path = path + [station_id]
-                            new_recharge_stops = recharge_stops + [station_id]
-                            new_remaining = battery_limit
-                            new_total_cost = total_cost + edge_cost
-                            new_segments = segments.copy()
-                            new_segments.append([current_id, station_id])
-                            
-                            queue.append((nearest_station, new_path, new_remaining, new_total_cost, 
-                                        new_recharge_stops, new_segments))
-        
-        if best_solution is None:
-            raise ValueError("No se encontro una ruta valida entre los vertices")
-            
-        return best_solution
-        
-    def _find_nearest_recharge_station(self, from_vertex, battery_limit):
-        """Encuentra la estacion de recarga mas cercana alcanzable con la bateria actual."""
-        queue = deque()
-        queue.append((from_vertex, 0))
-        visited = set()
-        
-        while queue:
-            current_vertex, current_cost = queue.popleft()
-            current_id = str(current_vertex.element())
-            
-            if current_id in self.recharge_stations:
-                return current_vertex
-                
-            if current_id in visited:
-                continue
-            visited.add(current_id)
-            
-            for neighbor in self.graph.neighbors(current_vertex):
-                edge = self.graph.get_edge(current_vertex, neighbor)
-                edge_cost = edge.element() if edge else 0
-                total_cost = current_cost + edge_cost
-                
-                if total_cost <= battery_limit:
-                    queue.append((neighbor, total_cost))
-                    
-        return None
-
-
 class AVLNode:
     """Nodo para el arbol AVL."""
     def __init__(self, key):
@@ -314,12 +31,23 @@ class AVLNode:
         self.left = None
         self.right = None
         self.height = 0  # nodo singular tiene altura 0
+        self.size = 1    # cantidad de nodos del subarbol (para select/rank)
 
 
 def avl_height(N):
     return -1 if N is None else N.height
 
 
+def avl_size(N):
+    return 0 if N is None else N.size
+
+
+def avl_update(N):
+    """Recalcula altura y tamano del nodo a partir de sus hijos."""
+    N.height = max(avl_height(N.left), avl_height(N.right)) + 1
+    N.size = avl_size(N.left) + avl_size(N.right) + 1
+
+
 def avl_get_balance(N):
     return 0 if N is None else avl_height(N.left) - avl_height(N.right)
 
@@ -332,9 +60,9 @@ def avl_right_rotate(y):
     x.right = y
     y.left = T2
 
-    # Actualizar alturas
-    y.height = max(avl_height(y.left), avl_height(y.right)) + 1
-    x.height = max(avl_height(x.left), avl_height(x.right)) + 1
+    # Actualizar alturas y tamanos
+    avl_update(y)
+    avl_update(x)
 
     return x
 
@@ -347,9 +75,9 @@ def avl_left_rotate(x):
     y.left = x
     x.right = T2
 
-    # Actualizar alturas
-    x.height = max(avl_height(x.left), avl_height(x.right)) + 1
-    y.height = max(avl_height(y.left), avl_height(y.right)) + 1
+    # Actualizar alturas y tamanos
+    avl_update(x)
+    avl_update(y)
 
     return y
 
@@ -365,7 +93,7 @@ def avl_insert(node, key):
     else:
         return node  # no se permiten duplicados
 
-    node.height = max(avl_height(node.left), avl_height(node.right)) + 1
+    avl_update(node)
     balance = avl_get_balance(node)
 
     # Casos de desbalanceo
@@ -409,7 +137,7 @@ def avl_delete_node(root, key):
     if root is None:
         return root
 
-    root.height = max(avl_height(root.left), avl_height(root.right)) + 1
+    avl_update(root)
     balance = avl_get_balance(root)
 
     if balance > 1 and avl_get_balance(root.left) >= 0:
@@ -428,84 +156,204 @@ def avl_delete_node(root, key):
 
 def avl_in_order(node):
     """Recorrido inorden del arbol AVL."""
-    if node is None:
-        return []
-    return avl_in_order(node.left) + [node.key] + avl_in_order(node.right)
-
-
-class HashMap:
-    """Implementacion basica de un HashMap con encadenamiento."""
-    def __init__(self, size=10):
-        self.size = size
-        self.table = [[] for _ in range(size)]
-
-    def _hash(self, key):
-        """Funcion hash simple basada en suma de codigos ASCII."""
-        return sum(ord(c) for c in str(key)) % self.size
-
-    def put(self, key, value):
-        """Inserta o actualiza un par clave-valor."""
-        index = self._hash(key)
-        for pair in self.table[index]:
-            if pair[0] == key:
-                pair[1] = value
+    return list(avl_iter_in_order(node))
+
+
+def avl_iter_in_order(node):
+    """Genera las claves en orden usando una pila explicita (sin recursion)."""
+    stack = []
+    while stack or node is not None:
+        if node is not None:
+            stack.append(node)
+            node = node.left
+        else:
+            node = stack.pop()
+            yield node.key
+            node = node.right
+
+
+def avl_iter_pre_order(node):
+    """Genera las claves en preorden usando una pila explicita."""
+    stack = [node] if node is not None else []
+    while stack:
+        node = stack.pop()
+        yield node.key
+        if node.right is not None:
+            stack.append(node.right)
+        if node.left is not None:
+            stack.append(node.left)
+
+
+def avl_iter_range(node, lo, hi):
+    """Genera en orden las claves con lo <= key <= hi, podando subarboles fuera del rango."""
+    stack = []
+    while stack or node is not None:
+        if node is not None:
+            if node.key < lo:
+                node = node.right
+            else:
+                stack.append(node)
+                node = node.left
+        else:
+            node = stack.pop()
+            if node.key > hi:
                 return
-        self.table[index].append([key, value])
-
-    def get(self, key):
-        """Obtiene el valor asociado a una clave."""
-        index = self._hash(key)
-        for pair in self.table[index]:
-            if pair[0] == key:
-                return pair[1]
-        return None
+            yield node.key
+            node = node.right
+
+
+def avl_select(node, i):
+    """Devuelve la i-esima clave (desde 0) en orden, o None si no existe."""
+    while node is not None:
+        left = avl_size(node.left)
+        if i < left:
+            node = node.left
+        elif i == left:
+            return node.key
+        else:
+            i -= left + 1
+            node = node.right
+    return None
+
+
+def avl_rank(node, key):
+    """Cantidad de claves menores que key en el arbol."""
+    rank = 0
+    while node is not None:
+        if key < node.key:
+            node = node.left
+        else:
+            if key == node.key:
+                return rank + avl_size(node.left)
+            rank += avl_size(node.left) + 1
+            node = node.right
+    return rank
+
 
-    def items(self):
-        """Genera todos los pares clave-valor."""
-        for bucket in self.table:
-            for key, value in bucket:
-                yield key, value
+def avl_top_k(node, k):
+    """Primeras k claves en orden, recorriendo solo O(log n + k) nodos."""
+    return list(islice(avl_iter_in_order(node), k))
 
 
 class RouteTracker:
     """Registra y analiza rutas historicas."""
-    def __init__(self):
-        self.root = None
+    def __init__(self, nodes=None):
+        self.nodes = nodes if nodes is not None else NodeTable()  # ids de nodo, se puede compartir
+        self.root = None       # AVL de rutas (tuplas de ids)
+        self.freq_root = None  # AVL con claves (-frecuencia, texto, ruta): mas frecuentes primero, empates alfabeticos
         self.route_counts = {}
+        self.route_labels = {}  # ruta -> texto 'A→B→C', calculado una vez por ruta para desempatar
         self.node_visits = {}
         self.custom_hashmap = None
         self.total_routes = 0
+        self.route_trie = RouteTrie()    # rutas por origen/prefijo
+        self.reverse_trie = RouteTrie()  # rutas invertidas: por destino/sufijo
+        self.segment_best = {}           # (x, y) -> terminal mas frecuente que pasa por x→y
+        self._subscribers = []           # agregadores notificados en cada registro
+
+    def subscribe(self, aggregator):
+        """Suscribe un agregador y lo pone al dia con el historial actual."""
+        for route, count in self.route_counts.items():
+            aggregator.on_route(route, count)
+        self._subscribers.append(aggregator)
+
+    def unsubscribe(self, aggregator):
+        self._subscribers.remove(aggregator)
+
+    def _route_key(self, route_path):
+        """Convierte una lista de nodos en la tupla de ids que identifica la ruta."""
+        if not route_path or not isinstance(route_path, list):
+            raise ValueError("La ruta debe ser una lista no vacia de nodos")
+        return self.nodes.intern_route([str(node) for node in route_path])
 
     def _route_to_str(self, route):
-        """Convierte ruta a string con formato 'A→B→C'."""
-        if not route or not isinstance(route, list):
-            raise ValueError("La ruta debe ser una lista no vacia de nodos")
-        return "→".join(str(node) for node in route)
+        """Convierte una ruta (tupla de ids) a string con formato 'A→B→C'."""
+        return self.nodes.render(route)
+
+    def route_nodes(self, route):
+        """Nombres de los nodos de una ruta (tupla de ids)."""
+        return self.nodes.names(route)
 
     def register_route(self, route_path, cost=None):
         """Registra una ruta y actualiza estadisticas."""
-        route_str = self._route_to_str(route_path)
+        route = self._route_key(route_path)
         
         # Actualizar AVL y conteo de rutas
-        self.root = avl_insert(self.root, route_str)
-        self.route_counts[route_str] = self.route_counts.get(route_str, 0) + 1
+        self.root = avl_insert(self.root, route)
+        count = self.route_counts.get(route, 0)
+        if count:
+            label = self.route_labels[route]
+            self.freq_root = avl_delete_node(self.freq_root, (-count, label, route))
+        else:
+            label = self.route_labels[route] = self._route_to_str(route)
+        self.freq_root = avl_insert(self.freq_root, (-(count + 1), label, route))
+        self.route_counts[route] = count + 1
         self.total_routes += 1
         
+        # Actualizar tries y tramos en O(largo de la ruta)
+        terminal = self.route_trie.insert(route, route)
+        self.reverse_trie.insert(route[::-1], route)
+        for segment in set(zip(route, route[1:])):
+            if more_frequent(terminal, self.segment_best.get(segment)):
+                self.segment_best[segment] = terminal
+
         # Actualizar visitas a nodos
-        for node in route_path:
-            node_str = str(node)
+        for node_str in self.nodes.names(route):
             self.node_visits[node_str] = self.node_visits.get(node_str, 0) + 1
+            if self.custom_hashmap is not None:
+                self.custom_hashmap.put(node_str, self.node_visits[node_str])
+
+        # Publicar el incremento a los agregadores suscritos
+        for aggregator in self._subscribers:
+            aggregator.on_route(route, 1)
 
     def get_most_frequent_routes(self, top_n=5):
-        """Obtiene las rutas mas frecuentes ordenadas por frecuencia."""
-        all_routes = avl_in_order(self.root)
-        freq_list = [(route, self.route_counts[route]) for route in all_routes if route in self.route_counts]
-        freq_list.sort(key=lambda x: (-x[1], x[0]))  # Ordenar por frecuencia (desc) y luego alfabeticamente
-        return freq_list[:top_n]
+        """Obtiene las rutas mas frecuentes ordenadas por frecuencia, como texto 'A→B→C'."""
+        return [(self._route_to_str(route), count) for route, count in self.get_most_frequent_route_keys(top_n)]
+
+    def get_most_frequent_route_keys(self, top_n=5):
+        """Como get_most_frequent_routes, con las rutas como tuplas de ids."""
+        # El indice ya esta ordenado por frecuencia (desc) y luego alfabeticamente
+        return [(route, -neg_count) for neg_count, _, route in avl_top_k(self.freq_root, top_n)]
+
+    def get_most_frequent_route(self, origin, destination):
+        """Ruta mas frecuente de origin a destination, como (tupla de ids, frecuencia), o None."""
+        origin_id, dest_id = self.nodes.lookup(str(origin)), self.nodes.lookup(str(destination))
+        if origin_id is None or dest_id is None:
+            return None
+        return self.route_trie.best_route((origin_id,), dest_id)
+
+    def get_most_frequent_route_through(self, x, y):
+        """Ruta mas frecuente que pasa por el tramo x→y, como (tupla de ids, frecuencia), o None."""
+        terminal = self.segment_best.get((self.nodes.lookup(str(x)), self.nodes.lookup(str(y))))
+        return (terminal.route, terminal.count) if terminal else None
+
+    def get_routes_starting_with(self, prefix):
+        """Genera (tupla de ids, frecuencia) de las rutas que empiezan con los nodos de prefix."""
+        prefix_ids = self.nodes.lookup_route([str(node) for node in prefix])
+        return self.route_trie.iter_routes(prefix_ids) if prefix_ids is not None else iter(())
+
+    def get_routes_ending_with(self, suffix):
+        """Genera (tupla de ids, frecuencia) de las rutas que terminan con los nodos de suffix."""
+        suffix_ids = self.nodes.lookup_route([str(node) for node in reversed(suffix)])
+        return self.reverse_trie.iter_routes(suffix_ids) if suffix_ids is not None else iter(())
+
+    def get_route_rank(self, route_path):
+        """Posicion (desde 0) de la ruta en el orden por frecuencia, o None si no existe."""
+        route = self.nodes.lookup_route([str(node) for node in route_path])
+        count = self.route_counts.get(route)
+        if count is None:
+            return None
+        return avl_rank(self.freq_root, (-count, self.route_labels[route], route))
+
+    def get_route_at(self, i):
+        """Ruta en la posicion i del orden por frecuencia, como (texto, frecuencia)."""
+        key = avl_select(self.freq_root, i)
+        return None if key is None else (key[1], -key[0])
 
     def get_node_visits_stats(self, sorted_by='visits'):
         """Obtiene estadisticas de nodos visitados."""
-        if not self.custom_hashmap:
+        if self.custom_hashmap is None:
             self.create_custom_hashmap()
             
         items = list(self.custom_hashmap.items())
@@ -518,9 +366,14 @@ class RouteTracker:
 
     def create_custom_hashmap(self, initial_size=10):
         """Crea un HashMap personalizado con las visitas a nodos."""
-        self.custom_hashmap = HashMap(size=initial_size)
-        for node, visits in self.node_visits.items():
-            self.custom_hashmap.put(node, visits)
+        self.custom_hashmap = HashMap(size=max(initial_size, len(self.node_visits)))
+        self.custom_hashmap.update(self.node_visits)
+
+    def get_node_visit_count(self, node):
+        """Visitas de un nodo, consultando el HashMap en O(1)."""
+        if self.custom_hashmap is None:
+            self.create_custom_hashmap()
+        return self.custom_hashmap.get(str(node), 0)
 
     def generate_report(self):
         """Genera un reporte estadistico completo."""
@@ -542,21 +395,32 @@ class RouteTracker:
 
 class RouteOptimizer:
     """Optimiza rutas basandose en datos historicos."""
-    def __init__(self, route_tracker, graph):
+    def __init__(self, route_tracker, graph, coords=None):
         self.route_tracker = route_tracker
         self.graph = graph
+        self.coords = coords or {}  # {nombre de nodo: (lat, lon)} para la heuristica de A*
+        self._scale = None          # (version del grafo, factor km -> unidades de peso)
         self.optimization_report = []
-        self.node_scores = self._calculate_node_scores()
+        # Puntuaciones y frecuencias por nodo, al dia con cada ruta registrada
+        self.aggregates = RouteAggregates(route_tracker.nodes)
+        route_tracker.subscribe(self.aggregates)
 
-    def _calculate_node_scores(self):
-        """Calcula puntuacion para cada nodo basada en frecuencia de visita."""
-        node_scores = defaultdict(int)
-        total_visits = sum(self.route_tracker.node_visits.values())
-        
-        for node, visits in self.route_tracker.node_visits.items():
-            node_scores[node] = visits / total_visits * 100
-            
-        return node_scores
+    def close(self):
+        """Desuscribe los agregados del tracker (tambien al salir de un bloque with)."""
+        if self.aggregates is not None:
+            self.route_tracker.unsubscribe(self.aggregates)
+            self.aggregates = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __del__(self):
+        # el tracker solo guarda los agregados: un optimizador descartado se desuscribe solo
+        if getattr(self, 'aggregates', None) is not None:
+            self.close()
 
     def suggest_optimized_route(self, origin, destination, battery_limit=None):
         """Sugiere ruta optima considerando multiples factores."""
@@ -566,7 +430,7 @@ class RouteOptimizer:
         # 1. Buscar ruta exacta frecuente
         exact_routes = self._find_exact_routes(origin_str, dest_str)
         if exact_routes:
-            return exact_routes[0].split("→")
+            return exact_routes[0]
             
         # 2. Buscar combinacion de segmentos
         combined_route = self._combine_route_segments(origin_str, dest_str)
@@ -578,49 +442,71 @@ class RouteOptimizer:
 
     def _find_exact_routes(self, origin, destination):
         """Busca rutas exactas en el historial."""
-        routes = [route for route, _ in self.route_tracker.get_most_frequent_routes(50) 
-                if route.startswith(origin) and route.endswith(destination)]
-        
-        if routes:
-            self.optimization_report.append(f"Usando ruta exacta frecuente: {routes[0]}")
-        return routes
+        best = self.route_tracker.get_most_frequent_route(origin, destination)
+        if not best:
+            return []
+        route = self.route_tracker.route_nodes(best[0])
+        self.optimization_report.append(f"Usando ruta exacta frecuente: {'→'.join(route)}")
+        return [route]
 
     def _combine_route_segments(self, origin, destination):
         """Intenta combinar segmentos de rutas conocidas."""
-        common_nodes = set()
+        node_table = self.route_tracker.nodes
+        origin_id, dest_id = node_table.lookup(origin), node_table.lookup(destination)
+        common_ids = set()
         
         # Buscar nodos que aparecen en rutas con origen y destino
-        for route, _ in self.route_tracker.get_most_frequent_routes(100):
-            nodes = route.split("→")
-            if origin in nodes and destination in nodes:
-                common_nodes.update(nodes)
+        for route, _ in self.route_tracker.get_most_frequent_route_keys(100):
+            if origin_id in route and dest_id in route:
+                common_ids.update(route)
                 
-        if not common_nodes:
+        if not common_ids:
             return None
+        common_nodes = {node_table.name(node_id) for node_id in common_ids}
             
         # Buscar el nodo intermedio con mejor puntuacion
-        best_node = max(common_nodes, key=lambda x: self.node_scores.get(x, 0))
+        best_node = max(common_nodes, key=self.aggregates.node_score)
         
         # Construir ruta combinada
-        combined_route = f"{origin}→{best_node}→{destination}"
         self.optimization_report.append(f"Combinando segmentos usando nodo intermedio {best_node}")
-        return combined_route.split("→")
+        return [origin, best_node, destination]
+
+    def _distance_scale(self, csr):
+        """Factor km -> unidades de peso de la heuristica de A* (model.geo.distance_scale), por version del grafo."""
+        version = self.graph.version()
+        if self._scale is None or self._scale[0] != version:
+            self._scale = (version, distance_scale(csr, self.coords) if self.coords else None)
+        return self._scale[1]
 
     def _calculate_new_route(self, origin, destination, battery_limit):
-        """Calcula nueva ruta usando Dijkstra considerando bateria."""
-        self.optimization_report.append("Calculando nueva ruta con algoritmo de busqueda")
-        
-        # Implementacion simplificada - en realidad deberia usar el grafo
-        # Esto es un placeholder - la implementacin real usaria el grafo
-        return [origin, destination]
+        """Calcula nueva ruta con A* (heuristica haversine) o Dijkstra si no hay coordenadas.
+
+        Con battery_limit solo acepta rutas cuyo costo total no lo supere.
+        Devuelve la lista de nodos, o [] si no hay ruta factible.
+        """
+        csr = self.graph.compile() if self.graph is not None else None
+        src = csr.index_of(origin) if csr is not None else None
+        dst = csr.index_of(destination) if csr is not None else None
+        if src is None or dst is None:
+            self.optimization_report.append("Origen o destino no existe en el grafo")
+            return []
+
+        scale = self._distance_scale(csr)
+        heuristic = heuristic_to(csr, dst, self.coords, scale) if scale else None
+        max_cost = battery_limit if battery_limit is not None else float('inf')
+        cost, path = csr.a_star(src, dst, heuristic, max_cost)
+        if not path:
+            self.optimization_report.append("No existe ruta factible con la bateria disponible")
+            return []
+
+        algorithm = "A*" if heuristic is not None else "Dijkstra"
+        self.optimization_report.append(f"Calculando nueva ruta con {algorithm} (costo {cost})")
+        return [csr.vertex_id(i) for i in path]
 
     def analyze_route_patterns(self):
         """Analiza patrones en las rutas mas frecuentes."""
-        node_visit_counts = defaultdict(int)
-        for route, freq in self.route_tracker.get_most_frequent_routes(50):
-            nodes = route.split("→")
-            for node in nodes:
-                node_visit_counts[node] += freq
+        # Frecuencia por nodo sobre todo el historial, mantenida por los agregados
+        node_visit_counts = defaultdict(int, self.aggregates.node_frequencies())
                 
         self.optimization_report.append(f"Analisis de patrones: nodos visitados con frecuencia {dict(node_visit_counts)}")
         return node_visit_counts
@@ -632,20 +518,59 @@ class RouteOptimizer:
 
 class OrderSimulator:
     """Simula ordenes de entrega con drones."""
-    def __init__(self):
+    def __init__(self, snapshot=None):
         self.graph = Graph(directed=False)
         self.max_energy = 20  # Energia maxima del dron
-        self.stats = {
+        self.stats = self._empty_stats()
+
+        # Crear vertices y aristas
+        self.vertices = {}
+        if snapshot is None:
+            self._initialize_graph()
+        else:
+            self._load_snapshot(snapshot)
+
+    @staticmethod
+    def _empty_stats():
+        """Estadisticas en cero."""
+        return {
             'total_orders': 0,
             'delivered': 0,
             'failed': 0,
             'total_cost': 0,
-            'total_recharges': 0
+            'total_recharges': 0,
+            'invalid': 0  # ordenes con almacen o cliente desconocido (contadas tambien como fallidas)
         }
 
-        # Crear vertices y aristas
-        self.vertices = {}
-        self._initialize_graph()
+    def snapshot(self):
+        """Copia compacta y serializable (pickle) del grafo y la configuracion."""
+        # se recorre en orden de insercion para que la adyacencia (y los empates
+        # de Dijkstra) sean iguales en todos los procesos
+        edges, seen = [], set()
+        for vertex in self.graph.vertices():
+            for edge in self.graph.incident_edges(vertex):
+                if edge not in seen:
+                    seen.add(edge)
+                    u, v = edge.endpoints()
+                    edges.append((u.element(), v.element(), edge.element()))
+        return {
+            'max_energy': self.max_energy,
+            'nodes': [(nombre, info['tipo']) for nombre, info in self.vertices.items()],
+            'edges': edges,
+            'almacenes': dict(self.almacenes),
+            'clientes': dict(self.clientes)
+        }
+
+    def _load_snapshot(self, snapshot):
+        """Reconstruye el grafo a partir de snapshot()."""
+        self.max_energy = snapshot['max_energy']
+        for nombre, tipo in snapshot['nodes']:
+            v = self.graph.insert_vertex(nombre)
+            self.vertices[nombre] = {'vertice': v, 'tipo': tipo}
+        for origen, destino, costo in snapshot['edges']:
+            self.graph.insert_edge(self.vertices[origen]['vertice'], self.vertices[destino]['vertice'], costo)
+        self.almacenes = dict(snapshot['almacenes'])
+        self.clientes = dict(snapshot['clientes'])
 
     def _initialize_graph(self):
         """Inicializa el grafo con nodos y conexiones."""
@@ -690,27 +615,9 @@ class OrderSimulator:
         }
 
     def dijkstra(self, origin_id):
-        """Implementacion del algoritmo de Dijkstra para caminos mas cortos."""
+        """Caminos mas cortos desde origin_id (memorizados por el grafo por origen)."""
         origen_v = self.vertices[origin_id]['vertice']
-        dist = {v: float('inf') for v in self.graph.vertices()}
-        prev = {v: None for v in self.graph.vertices()}
-        dist[origen_v] = 0
-
-        pq = [(0, origen_v)]  # cola de prioridad
-
-        while pq:
-            d, u = heapq.heappop(pq)
-            if d > dist[u]: 
-                continue
-            for edge in self.graph.incident_edges(u):
-                v = edge.opposite(u)
-                peso = edge.element()
-                if dist[u] + peso < dist[v]:
-                    dist[v] = dist[u] + peso
-                    prev[v] = u
-                    heapq.heappush(pq, (dist[v], v))
-
-        return dist, prev
+        return self.graph.shortest_path_tree(origen_v)
 
     def reconstruir_camino(self, prev, destino_v):
         """Reconstruye el camino desde el destino hasta el origen."""
@@ -753,18 +660,120 @@ class OrderSimulator:
         """Procesa multiples ordenes de entrega."""
         print(f"\n=== Simulando {cantidad} ordenes ===")
         print(f"Hora de inicio: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        
-        for i in range(1, cantidad + 1):
-            result = self._process_single_order(i)
-            self._print_order_result(result)
-            self._update_stats(result)
-            
+
+        self.process_order_stream(random_order_source(self, cantidad), sink=self._print_order_chunk,
+                                  queue_size=0)
+
         self._print_final_stats()
 
-    def _process_single_order(self, order_num):
+    def process_order_stream(self, source, sink=None, chunk_size=1000, queue_size=4):
+        """
+        Procesa un flujo de ordenes en memoria constante: fuente -> ruteo -> estadisticas -> sink.
+
+        source es cualquier iterable de ordenes {'origen', 'destino'[, 'orden']}
+        (random_order_source, jsonl_order_source o un iterador propio). Las ordenes
+        se procesan en bloques de chunk_size; entre la fuente y el ruteo hay una cola
+        de queue_size bloques leida por un hilo aparte (0 = sin hilo), que se bloquea
+        cuando esta llena, asi nunca hay mas de queue_size + 1 bloques en memoria.
+        sink recibe cada bloque de resultados (por ejemplo jsonl_sink(archivo)).
+        """
+        chunks = chunked(source, chunk_size)
+        if queue_size:
+            chunks = bounded_prefetch(chunks, queue_size)
+        for results in self._stats_stage(self._route_stage(chunks)):
+            if sink is not None:
+                sink(results)
+        return self.stats
+
+    def _route_stage(self, chunks):
+        """Etapa de ruteo: bloques de ordenes -> bloques de resultados."""
+        order_num = 0
+        for chunk in chunks:
+            results = []
+            for order in chunk:
+                order_num += 1
+                # una orden invalida del registro no detiene el flujo: se registra como fallida
+                error = self._order_error(order)
+                if error is not None:
+                    results.append(self._invalid_order(order_num, order, error))
+                    continue
+                results.append(self._route_order(order.get('orden', order_num), order['origen'], order['destino']))
+            yield results
+
+    def _order_error(self, order):
+        """Motivo por el que una orden no se puede rutear, o None si es valida."""
+        if not isinstance(order, dict):
+            return f"Registro invalido: {order!r}"
+        if 'error' in order:
+            return order['error']  # marcado por la fuente (por ejemplo, JSON invalido)
+        for key in ('origen', 'destino'):
+            if key not in order:
+                return f"Falta el campo: {key}"
+        if order['origen'] not in self.almacenes:
+            return f"Almacen desconocido: {order['origen']}"
+        if order['destino'] not in self.clientes:
+            return f"Cliente desconocido: {order['destino']}"
+        return None
+
+    def _invalid_order(self, order_num, order, error):
+        """Resultado fallido de una orden que no se puede rutear."""
+        if not isinstance(order, dict):
+            order = {}
+        return {
+            'orden': order.get('orden', order_num),
+            'origen': order.get('origen'),
+            'destino': order.get('destino'),
+            'ruta': [],
+            'costo': 0,
+            'recargas': [],
+            'estado': 'Fallido',
+            'error': error
+        }
+
+    def _stats_stage(self, chunks):
+        """Etapa de estadisticas: acumula cada resultado y deja pasar el bloque."""
+        for results in chunks:
+            for result in results:
+                self._update_stats(result)
+            yield results
+
+    def _print_order_chunk(self, results):
+        for result in results:
+            self._print_order_result(result)
+
+    def process_orders_batch(self, cantidad, workers=None, chunk_size=1000, seed=0):
+        """
+        Procesa ordenes en paralelo con un pool de procesos.
+
+        Cada worker recibe una sola vez snapshot() del grafo y procesa bloques de
+        chunk_size ordenes con un RNG sembrado por (seed, bloque), por lo que el
+        resultado es reproducible y no depende de la cantidad de workers.
+        Las estadisticas de los bloques se suman en orden.
+        """
+        chunks = [(idx, start + 1, min(chunk_size, cantidad - start), seed)
+                  for idx, start in enumerate(range(0, cantidad, chunk_size))]
+
+        if workers == 1:
+            _init_batch_worker(self.snapshot())
+            partials = [_run_order_chunk(chunk) for chunk in chunks]
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker,
+                                     initargs=(self.snapshot(),)) as pool:
+                partials = list(pool.map(_run_order_chunk, chunks))
+
+        for partial in partials:
+            for key, value in partial.items():
+                self.stats[key] += value
+        return self.stats
+
+    def _process_single_order(self, order_num, rng=random):
         """Procesa una sola orden de entrega."""
-        origen_nom = random.choice(list(self.almacenes.keys()))
-        destino_nom = random.choice(list(self.clientes.keys()))
+        origen_nom = rng.choice(list(self.almacenes.keys()))
+        destino_nom = rng.choice(list(self.clientes.keys()))
+        return self._route_order(order_num, origen_nom, destino_nom)
+
+    def _route_order(self, order_num, origen_nom, destino_nom):
+        """Calcula ruta, recargas y estado de una orden entre un almacen y un cliente."""
         origen_id = self.almacenes[origen_nom]
         destino_id = self.clientes[destino_nom]
 
@@ -792,16 +801,19 @@ class OrderSimulator:
         print(f"Costo: {result['costo']} | Paradas de recarga: {result['recargas']}")
         print(f"Estado: {result['estado']}\n")
 
-    def _update_stats(self, result):
-        """Actualiza las estadisticas globales."""
-        self.stats['total_orders'] += 1
+    def _update_stats(self, result, stats=None):
+        """Actualiza las estadisticas globales (o las de un bloque si se entregan)."""
+        stats = self.stats if stats is None else stats
+        stats['total_orders'] += 1
         if result['estado'] == 'Entregado':
-            self.stats['delivered'] += 1
+            stats['delivered'] += 1
         else:
-            self.stats['failed'] += 1
+            stats['failed'] += 1
             
-        self.stats['total_cost'] += result['costo']
-        self.stats['total_recharges'] += len(result['recargas'])
+        stats['total_cost'] += result['costo']
+        stats['total_recharges'] += len(result['recargas'])
+        if 'error' in result:
+            stats['invalid'] += 1
 
     def _print_final_stats(self):
         """Imprime estadisticas finales del simulador."""
@@ -810,11 +822,140 @@ class OrderSimulator:
         success_rate = self.stats['delivered'] / self.stats['total_orders'] if self.stats['total_orders'] > 0 else 0
         print(f"Entregas exitosas: {self.stats['delivered']} ({success_rate:.1%})")
         print(f"Entregas fallidas: {self.stats['failed']}")
+        if self.stats['invalid']:
+            print(f"Ordenes invalidas (almacen o cliente desconocido): {self.stats['invalid']}")
         print(f"Costo total acumulado: {self.stats['total_cost']}")
         print(f"Paradas de recarga totales: {self.stats['total_recharges']}")
         print(f"\nHora de finalizacion: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 
 
+# --------------------------
+#   Pipeline de Ordenes
+# --------------------------
+
+def random_order_source(simulator, cantidad, rng=random):
+    """Genera cantidad ordenes aleatorias (almacen -> cliente) del simulador, una a la vez."""
+    almacenes = list(simulator.almacenes.keys())
+    clientes = list(simulator.clientes.keys())
+    for i in range(1, cantidad + 1):
+        origen = rng.choice(almacenes)
+        destino = rng.choice(clientes)
+        yield {'orden': i, 'origen': origen, 'destino': destino}
+
+
+def jsonl_order_source(path):
+    """
+    Lee ordenes de un archivo JSONL (un objeto por linea) sin cargarlo completo.
+
+    Una linea que no es JSON valido o que no es un objeto no detiene la lectura:
+    se entrega como {'error': motivo} y el ruteo la registra como orden fallida.
+    """
+    with open(path, encoding='utf-8') as f:
+        for line_num, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield {'error': f"Linea {line_num}: JSON invalido ({e.msg})"}
+                continue
+            if not isinstance(record, dict):
+                yield {'error': f"Linea {line_num}: se esperaba un objeto, no {type(record).__name__}"}
+                continue
+            yield record
+
+
+def jsonl_sink(f):
+    """Sink que escribe cada resultado como una linea JSON en el archivo abierto f."""
+    def write(results):
+        f.writelines(json.dumps(result, ensure_ascii=False) + "\n" for result in results)
+    return write
+
+
+def chunked(iterable, size):
+    """Agrupa un iterable en listas de hasta size elementos."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+_END_OF_STREAM = object()
+
+
+def bounded_prefetch(iterable, maxsize):
+    """
+    Consume iterable en un hilo aparte a traves de una cola de maxsize elementos.
+
+    Cuando la cola esta llena el hilo productor espera (backpressure), asi la
+    lectura de la fuente se adelanta al consumidor sin acumular mas de maxsize.
+    Las excepciones de la fuente se relanzan en el consumidor.
+    """
+    queue = Queue(maxsize)
+    stop = Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                queue.put(item, timeout=0.1)
+                return True
+            except Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put(item):
+                    return
+            put(_END_OF_STREAM)
+        except BaseException as e:
+            put((_END_OF_STREAM, e))
+
+    thread = Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = queue.get()
+            if item is _END_OF_STREAM:
+                return
+            if isinstance(item, tuple) and len(item) == 2 and item[0] is _END_OF_STREAM:
+                raise item[1]
+            yield item
+    finally:
+        # si el consumidor se detiene antes, el productor deja de esperar
+        stop.set()
+        while True:
+            try:
+                queue.get_nowait()
+            except Empty:
+                break
+        thread.join()
+
+
+# Estado de cada proceso del pool de process_orders_batch
+_BATCH_SIMULATOR = None
+
+
+def _init_batch_worker(snapshot):
+    """Construye una vez por proceso el simulador a partir del snapshot."""
+    global _BATCH_SIMULATOR
+    _BATCH_SIMULATOR = OrderSimulator(snapshot)
+
+
+def _run_order_chunk(chunk):
+    """Procesa un bloque de ordenes y retorna sus estadisticas parciales."""
+    idx, first_order, cantidad, seed = chunk
+    rng = random.Random(f"{seed}-{idx}")
+    stats = OrderSimulator._empty_stats()
+    for order_num in range(first_order, first_order + cantidad):
+        result = _BATCH_SIMULATOR._process_single_order(order_num, rng)
+        _BATCH_SIMULATOR._update_stats(result, stats)
+    return stats
+
+
 # --------------------------
 #     Funcion Principal
 # --------------------------
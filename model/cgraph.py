@@ -1,83 +1,41 @@
-import heapq
+from collections import deque
 from copy import deepcopy
 from model.vertex import Vertex
-from model.edge import Edge
-
-class Graph:
-    def __init__(self, directed=False):
-        self._outgoing = {}
-        self._incoming = {} if directed else self._outgoing
-        self._directed = directed
-
-    def is_directed(self):
-        return self._directed
-
-    def insert_vertex(self, element):
-        v = Vertex(element)
-        self._outgoing[v] = {}
-        if self._directed:
-            self._incoming[v] = {}
-        return v
-
-    def insert_edge(self, u, v, element):
-        e = Edge(u, v, element)
-        self._outgoing[u][v] = e
-        self._incoming[v][u] = e
-        return e
-
-    def remove_edge(self, u, v):
-        if u in self._outgoing and v in self._outgoing[u]:
-            del self._outgoing[u][v]
-            del self._incoming[v][u]
-
-    def remove_vertex(self, v):
-        for u in list(self._outgoing.get(v, {})):
-            self.remove_edge(v, u)
-        for u in list(self._incoming.get(v, {})):
-            self.remove_edge(u, v)
-        self._outgoing.pop(v, None)
-        if self._directed:
-            self._incoming.pop(v, None)
-
-    def get_edge(self, u, v):
-        return self._outgoing.get(u, {}).get(v)
-
-    def vertices(self):
-        return self._outgoing.keys()
-
-    def edges(self):
-        seen = set()
-        for map in self._outgoing.values():
-            seen.update(map.values())
-        return seen
-
-    def neighbors(self, v):
-        return self._outgoing[v].keys()
-
-    def degree(self, v, outgoing=True):
-        adj = self._outgoing if outgoing else self._incoming
-        return len(adj[v])
-
-    def incident_edges(self, v, outgoing=True):
-        adj = self._outgoing if outgoing else self._incoming
-        return adj[v].values()
+from model.graph import Graph as BaseGraph
+from model.mst import prim_dense
 
+class Graph(BaseGraph):
+    """Graph with traversal, spanning tree and shortest path algorithms."""
 
     def dfs(self, start, visited=None):
+        """Lazy depth-first traversal from start.
+
+        Uses an explicit stack of neighbor iterators, so it visits vertices in
+        the same order as the recursive version without hitting the recursion
+        limit on long paths.
+        """
         if visited is None:
             visited = set()
         visited.add(start)
         yield start
-        for neighbor in self.neighbors(start):
-            if neighbor not in visited:
-                yield from self.dfs(neighbor, visited)
+        stack = [iter(self.neighbors(start))]
+        while stack:
+            for neighbor in stack[-1]:
+                if neighbor not in visited:
+                    visited.add(neighbor)
+                    yield neighbor
+                    stack.append(iter(self.neighbors(neighbor)))
+                    break
+            else:
+                stack.pop()
 
     def bfs(self, start):
+        """Lazy breadth-first traversal from start (deque, O(1) per dequeue)."""
         visited = set()
-        queue = [start]
+        queue = deque([start])
         visited.add(start)
         while queue:
-            v = queue.pop(0)
+            v = queue.popleft()
             yield v
             for neighbor in self.neighbors(v):
                 if neighbor not in visited:
@@ -85,25 +43,34 @@ class Graph:
                     queue.append(neighbor)
 
     def topological_sort(self):
-        in_degree = {v: 0 for v in self.vertices()}
-        for u in self.vertices():
-            for v in self.neighbors(u):
-                in_degree[v] += 1
+        """Vertices in topological order (Kahn's algorithm on the compiled CSR arrays).
 
-        queue = [v for v in self.vertices() if in_degree[v] == 0]
-        result = []
+        Raises ValueError if the graph has a cycle.
+        """
+        csr = self.compile()
+        return [csr.vertex(i) for i in csr.topological_order()]
 
-        while queue:
-            u = queue.pop(0)
-            result.append(u)
-            for v in self.neighbors(u):
-                in_degree[v] -= 1
-                if in_degree[v] == 0:
-                    queue.append(v)
+    def bfs_distances(self, sources):
+        """Hop count from the nearest of the given vertices, as {vertex: hops} for the reachable ones."""
+        csr = self.compile()
+        if isinstance(sources, Vertex):
+            sources = [sources]
+        dist, _ = csr.bfs_levels([csr.index(s) for s in sources])
+        return {csr.vertex(i): d for i, d in enumerate(dist) if d >= 0}
+
+    def connected_components(self):
+        """List of components, each a list of vertices (weakly connected if directed)."""
+        csr = self.compile()
+        labels, count = csr.connected_components()
+        components = [[] for _ in range(count)]
+        for i, label in enumerate(labels):
+            components[label].append(csr.vertex(i))
+        return components
 
-        if len(result) != len(in_degree):
-            raise ValueError("Graph has a cycle. Topological sort not possible.")
-        return result
+    def is_connected(self):
+        """True if every vertex can be reached from every other one, ignoring edge direction."""
+        csr = self.compile()
+        return len(csr) <= 1 or csr.connected_components()[1] == 1
 
 
 
@@ -112,12 +79,11 @@ class Graph:
 
         '''
             Kruskal's algorithm for finding the Minimum Spanning Tree (MST) of a graph.
-            This implementation uses a union-find structure to efficiently manage connected components.
-        1. Initialize a union-find structure to manage connected components.
-        2. Sort all edges in non-decreasing order of their weight.  
-        3. Iterate through the sorted edges and for each edge:
-            a. Check if the endpoints of the edge belong to different components using the union-find structure.
-            b. If they do, add the edge to the MST and union the components.
+            Runs on the compiled CSR edge list with the array-based union-find of model.mst.kruskal.
+        1. Take the edge list of the compiled CSR arrays (each undirected edge once).
+        2. Sort it by weight once.
+        3. Scan the sorted edges and keep each one whose endpoints are in different components,
+           merging components by size.
         4. Stop when the number of edges in the MST is equal to the number of vertices minus one.
         5. Return the edges in the MST.
 
@@ -127,41 +93,36 @@ class Graph:
         returns:
             mst: A list of edges that form the Minimum Spanning Tree of the graph.
             '''
-        parent = {}
-        def find(v):
-            while parent[v] != v:
-                parent[v] = parent[parent[v]]  
-                v = parent[v]
-            return v
-
-        def union(u, v):
-            ru, rv = find(u), find(v)
-            if ru != rv:
-                parent[rv] = ru
-                return True
-            return False
-
-        for v in self.vertices():
-            parent[v] = v
-
-      
-        heap = [(e.element(), i, e) for i, e in enumerate(self.edges())]
-        heapq.heapify(heap)
-
-        mst = []
-        while heap and len(mst) < len(parent) - 1:
-            weight, _, edge = heapq.heappop(heap)
-            u, v = edge.endpoints()
-            if union(u, v):
-                mst.append(edge)
-
-        return mst
+        csr = self.compile()
+        return [self.get_edge(csr.vertex(u), csr.vertex(v)) for u, v, _ in csr.kruskal_mst()]
+
+    def prim_mst(self):
+        '''
+        Prim's algorithm on a dense NumPy weight matrix, for dense or nearly complete graphs.
+        1. Build an n x n matrix with the edge weights from the CSR arrays and infinity elsewhere.
+        2. Grow the tree from one vertex, keeping for every outside vertex its cheapest edge into the tree.
+        3. Each step adds the cheapest outside vertex and updates the whole array with one vectorized row comparison.
+
+        parameters:
+            None
+
+        returns:
+            mst: A list of edges that form the Minimum Spanning Tree (forest, if disconnected) of the graph.
+        '''
+        import numpy as np  # NumPy is only needed by the dense-matrix methods
+        csr = self.compile()
+        n = len(csr)
+        weights = np.full((n, n), np.inf)
+        for u, v, w in csr.edge_list():
+            weights[u, v] = weights[v, u] = min(w, weights[u, v])
+        return [self.get_edge(csr.vertex(u), csr.vertex(v)) for u, v, _ in prim_dense(weights)]
 
     # --- Algoritmo de Dijkstra usando heapq estándar ---
     def dijkstra_shortest_paths(self, src):
         '''
         Dijkstra's algorithm for finding the shortest paths from a source vertex to all other vertices in a weighted graph.
-        This implementation uses a priority queue (min-heap) to efficiently retrieve the next vertex with the smallest distance.
+        This implementation uses a priority queue (min-heap) to efficiently retrieve the next vertex with the smallest distance,
+        and runs on the compiled CSR arrays of the graph (see compile()).
         1. Initialize a distance dictionary with all vertices set to infinity, except the source vertex which is set to 0.
         2. Create a priority queue (min-heap) and add the source vertex with distance 0.
         3. While the heap is not empty:
@@ -180,39 +141,116 @@ class Graph:
             dist: A dictionary mapping each vertex to its shortest distance from the source vertex.
 
         '''
-        dist = {v: float('inf') for v in self.vertices()}
-        dist[src] = 0
-        heap = [(0, id(src), src)]
-        visited = set()
+        csr = self.compile()
+        dist, _ = csr.dijkstra_shortest_paths(csr.index(src))
+        return {csr.vertex(i): d for i, d in enumerate(dist)}
 
-        while heap:
-            d, _, u = heapq.heappop(heap)
-            if u in visited:
-                continue
-            visited.add(u)
-            for e in self.incident_edges(u):
-                v = e.opposite(u)
-                if v not in visited:
-                    alt = d + e.element()
-                    if alt < dist[v]:
-                        dist[v] = alt
-                        heapq.heappush(heap, (alt, id(v), v))
+    def shortest_path(self, src, dst, battery_limit=None):
+        '''
+        Shortest path between two vertices with bidirectional Dijkstra.
+        Use it instead of dijkstra_shortest_paths() when only one origin-destination pair is needed.
+        1. Search forward from src and backward from dst on the compiled CSR arrays, always advancing the side
+           with the smaller tentative distance.
+        2. Keep the best path found where both searches meet.
+        3. Stop as soon as the two frontiers together can no longer beat that path.
+        4. If battery_limit is given, drop labels above it, so only routes whose total cost fits in one charge are returned.
 
-        return dist
+        parameters:
+            src: The origin vertex.
+            dst: The destination vertex.
+            battery_limit: Optional maximum total cost of the route.
+
+        returns:
+            (cost, path): cost of the route and the list of vertices from src to dst,
+                          or (inf, []) if there is no (feasible) route.
+        '''
+        csr = self.compile()
+        max_cost = battery_limit if battery_limit is not None else float('inf')
+        cost, path = csr.bidirectional_dijkstra(csr.index(src), csr.index(dst), max_cost)
+        return cost, [csr.vertex(i) for i in path]
+
+    def distance_table(self, sources, targets):
+        '''
+        Many-to-many distance table between two groups of vertices (e.g. warehouses x clients).
+        1. Build (or reuse) the contraction hierarchy of the graph, see contraction_hierarchy().
+        2. Run one small backward search per target, storing (target, distance) in buckets at every vertex reached.
+        3. Run one small forward search per source and combine its distances with the buckets it finds.
+        All pairs come out of |sources| + |targets| upward searches instead of one full Dijkstra per pair or per source.
+
+        parameters:
+            sources: Vertex ids (elements) of the rows.
+            targets: Vertex ids (elements) of the columns.
+
+        returns:
+            table: len(sources) x len(targets) float array with the shortest distances (inf if unreachable).
+            source_index: dict mapping each source id to its row.
+            target_index: dict mapping each target id to its column.
+        '''
+        import numpy as np
+        hierarchy = self.contraction_hierarchy()
+        source_ids = [str(s) for s in sources]
+        target_ids = [str(t) for t in targets]
+        missing = [i for i in source_ids + target_ids if hierarchy.index_of(i) is None]
+        if missing:
+            raise KeyError(missing[0])
+
+        rows = hierarchy.distance_table([hierarchy.index_of(i) for i in source_ids],
+                                        [hierarchy.index_of(i) for i in target_ids])
+        table = np.array(rows, dtype=float).reshape(len(source_ids), len(target_ids))
+        source_index = {vertex_id: i for i, vertex_id in enumerate(source_ids)}
+        target_index = {vertex_id: j for j, vertex_id in enumerate(target_ids)}
+        return table, source_index, target_index
 
     # --- Algoritmo de Floyd-Warshall ---
+    def floyd_warshall_matrix(self):
+        '''
+        Floyd-Warshall algorithm over a dense NumPy distance matrix.
+
+        1. Build an n x n matrix with infinity everywhere, 0 on the diagonal and the edge weights from the CSR arrays.
+        2. Build a next-hop matrix: nxt[i, j] is the vertex that follows i on a shortest path to j (-1 if unreachable).
+        3. For each pivot k, compute every i -> k -> j distance at once by broadcasting column k against row k,
+           keep the smaller value with np.minimum and copy nxt[i, k] where the pivot improved the distance.
+
+        parameters:
+            None
+
+        returns:
+            dist: n x n float array with the shortest distance between every pair of vertices (inf if unreachable).
+            nxt: n x n int array with the next hop of every shortest path.
+            vertices: list with the vertex of each row/column.
+        '''
+        import numpy as np
+        csr = self.compile()
+        n = len(csr)
+        rows = np.repeat(np.arange(n), np.diff(np.asarray(csr.offsets)))
+        cols = np.asarray(csr.targets, dtype=np.int64)
+
+        dist = np.full((n, n), np.inf)
+        dist[rows, cols] = np.asarray(csr.weights, dtype=float)
+        nxt = np.full((n, n), -1, dtype=np.int64)
+        nxt[rows, cols] = cols
+        diag = np.arange(n)
+        dist[diag, diag] = np.minimum(dist[diag, diag], 0)
+        nxt[diag, diag] = diag
+
+        for k in range(n):
+            alt = dist[:, k, None] + dist[None, k, :]
+            better = alt < dist
+            np.minimum(dist, alt, out=dist)
+            nxt[better] = np.broadcast_to(nxt[:, k, None], (n, n))[better]
+
+        return dist, nxt, [csr.vertex(i) for i in range(n)]
+
     def floyd_warshall(self):
         '''
         Floyd-Warshall algorithm for finding the shortest paths between all pairs of vertices in a weighted graph.
-        This implementation uses a dynamic programming approach to iteratively update the shortest paths.
-
-        1. Initialize a distance dictionary with all pairs of vertices set to infinity, except for the diagonal (same vertex) which is set to 0.
-        2. For each edge in the graph, set the distance between its endpoints to the
-        weight of the edge.
-        3. For each vertex k, iterate through all pairs of vertices (i, j) and update the distance from i to j if a shorter path through k is found.
-        4. If a shorter path is found, update the distance and the edge in the graph.
-        5. Return a new graph with the updated edges representing the shortest paths.
-        
+        Adapter over floyd_warshall_matrix() that keeps the closure-graph output.
+
+        1. Compute the distance matrix with floyd_warshall_matrix().
+        2. Copy the graph.
+        3. For every pair (i, j) whose shortest distance is smaller than the direct edge (or there is no edge),
+           update the edge weight or insert a new edge with that distance.
+        4. Return the copied graph with the updated edges representing the shortest paths.
 
         parameters:
             None
@@ -221,23 +259,33 @@ class Graph:
             closure: A new graph with the shortest paths between all pairs of vertices.
         
         '''
+        import numpy as np
+        dist, _, verts = self.floyd_warshall_matrix()
+        as_int = self.compile().weights.typecode == 'q'
         closure = deepcopy(self)
-        verts = list(closure.vertices())
-        dist = { (u,v): float('inf') for u in verts for v in verts }
-        for v in verts:
-            dist[(v, v)] = 0
-        for e in closure.edges():
-            u, v = e.endpoints()
-            dist[(u, v)] = e.element()
-
-        for k in verts:
-            for i in verts:
-                for j in verts:
-                    if dist[(i, j)] > dist[(i, k)] + dist[(k, j)]:
-                        dist[(i, j)] = dist[(i, k)] + dist[(k, j)]
-                        if closure.get_edge(i, j):
-                            closure._outgoing[i][j]._element = dist[(i, j)]
-                        else:
-                            closure.insert_edge(i, j, dist[(i, j)])
+        # deepcopy conserva el orden de los vertices, asi que las filas coinciden
+        closure_verts = list(closure.vertices())
+
+        for i, j in zip(*np.nonzero(np.isfinite(dist))):
+            if i == j:
+                continue
+            d = int(dist[i, j]) if as_int else float(dist[i, j])
+            u, v = closure_verts[i], closure_verts[j]
+            edge = closure.get_edge(u, v)
+            if edge is None:
+                closure.insert_edge(u, v, d)
+            elif d < edge.element():
+                edge._element = d
+        closure._version += 1  # los pesos se actualizaron directamente sobre las aristas
         return closure
 
+
+def next_hop_path(nxt, i, j):
+    """Return the list of indices on the shortest path from i to j, or [] if unreachable."""
+    if nxt[i, j] == -1:
+        return []
+    path = [i]
+    while i != j:
+        i = int(nxt[i, j])
+        path.append(i)
+    return path
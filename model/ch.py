@@ -0,0 +1,264 @@
+import heapq
+
+
+class ContractionHierarchy:
+    """Contraction hierarchy over a compiled graph for fast point-to-point queries.
+
+    Vertices are contracted one by one, cheapest first (edge difference plus
+    the number of already contracted neighbours). Contracting v adds a
+    shortcut u -> x with middle vertex v for every u -> v -> x that has no
+    witness path of equal or lower cost avoiding v. A query then runs two tiny
+    Dijkstra searches that only climb to higher-ranked vertices.
+
+    Everything is stored by vertex index with plain lists, so to_dict() can be
+    pickled or dumped to JSON and cached together with the graph.
+
+    Do not call constructor directly. Use build() or Graph's contraction_hierarchy().
+    """
+    WITNESS_SETTLE_LIMIT = 500  # vertices settled per witness search before giving up (adds the shortcut)
+
+    def __init__(self, ids, rank, up_out, up_in):
+        self._ids = ids
+        self._index = {vertex_id: i for i, vertex_id in enumerate(ids)}
+        self.rank = rank
+        self.up_out = up_out  # up_out[u] = {x: (weight, middle)} for u -> x with rank[x] > rank[u]
+        self.up_in = up_in    # up_in[x] = {u: (weight, middle)} for u -> x with rank[u] > rank[x]
+
+    @classmethod
+    def build(cls, csr):
+        """Contract every vertex of a CSRGraph and return the hierarchy."""
+        n = len(csr)
+        out_adj = [{} for _ in range(n)]
+        in_adj = [{} for _ in range(n)]
+        for u in range(n):
+            for v, w in csr.neighbors(u):
+                if u != v and w < out_adj[u].get(v, (float('inf'),))[0]:
+                    out_adj[u][v] = (w, -1)
+                    in_adj[v][u] = (w, -1)
+
+        contracted = [False] * n
+        deleted_neighbors = [0] * n
+        rank = [0] * n
+        up_out = [None] * n
+        up_in = [None] * n
+
+        def shortcuts(v):
+            found = []
+            for u, (w_in, _) in in_adj[v].items():
+                targets = {x: w_in + w_out for x, (w_out, _) in out_adj[v].items() if x != u}
+                if not targets:
+                    continue
+                dist = cls._witness(out_adj, u, v, max(targets.values()), targets)
+                for x, via in targets.items():
+                    if dist.get(x, float('inf')) > via:
+                        found.append((u, x, via))
+            return found
+
+        def priority(v):
+            return len(shortcuts(v)) - len(in_adj[v]) - len(out_adj[v]) + deleted_neighbors[v]
+
+        heap = [(priority(v), v) for v in range(n)]
+        heapq.heapify(heap)
+        order = 0
+        while heap:
+            _, v = heapq.heappop(heap)
+            if contracted[v]:
+                continue
+            # lazy update: re-evaluate and put back if it is no longer the cheapest
+            p = priority(v)
+            if heap and p > heap[0][0]:
+                heapq.heappush(heap, (p, v))
+                continue
+
+            for u, x, via in shortcuts(v):
+                if via < out_adj[u].get(x, (float('inf'),))[0]:
+                    out_adj[u][x] = (via, v)
+                    in_adj[x][u] = (via, v)
+
+            contracted[v] = True
+            rank[v] = order
+            order += 1
+            up_out[v] = out_adj[v]
+            up_in[v] = in_adj[v]
+            for x in out_adj[v]:
+                del in_adj[x][v]
+                deleted_neighbors[x] += 1
+            for u in in_adj[v]:
+                del out_adj[u][v]
+                deleted_neighbors[u] += 1
+
+        ids = [csr.vertex_id(i) for i in range(n)]
+        return cls(ids, rank, up_out, up_in)
+
+    @classmethod
+    def _witness(cls, out_adj, source, skip, limit, targets):
+        """Bounded Dijkstra from source that avoids skip; returns the distances found."""
+        dist = {source: 0}
+        heap = [(0, source)]
+        pending = len(targets)
+        settled = 0
+        while heap and pending and settled < cls.WITNESS_SETTLE_LIMIT:
+            d, u = heapq.heappop(heap)
+            if d > dist[u]:
+                continue
+            if d > limit:
+                break
+            settled += 1
+            if u in targets:
+                pending -= 1
+            for v, (w, _) in out_adj[u].items():
+                if v == skip:
+                    continue
+                alt = d + w
+                if alt < dist.get(v, float('inf')):
+                    dist[v] = alt
+                    heapq.heappush(heap, (alt, v))
+        return dist
+
+    def __len__(self):
+        return len(self._ids)
+
+    def index_of(self, vertex_id):
+        """Return the index of the vertex whose element is vertex_id, or None."""
+        return self._index.get(str(vertex_id))
+
+    def query(self, src, dst):
+        '''
+        Shortest path between two indices.
+
+        parameters:
+            src, dst: indices of the endpoints.
+
+        returns:
+            (cost, path) with path as a list of indices, or (inf, []) if dst is unreachable.
+        '''
+        inf = float('inf')
+        if src == dst:
+            return 0, [src]
+        adj = (self.up_out, self.up_in)
+        dist = ({src: 0}, {dst: 0})
+        parent = ({src: -1}, {dst: -1})
+        heaps = ([(0, src)], [(0, dst)])
+        best, meet = inf, -1
+
+        # both searches only climb in rank and alternate one step at a time
+        while heaps[0] or heaps[1]:
+            for side in (0, 1):
+                heap = heaps[side]
+                if not heap:
+                    continue
+                if heap[0][0] >= best:
+                    heap.clear()  # this side cannot improve the answer any more
+                    continue
+                d, u = heapq.heappop(heap)
+                if d > dist[side][u]:
+                    continue
+                other = dist[1 - side].get(u)
+                if other is not None and d + other < best:
+                    best, meet = d + other, u
+                my_dist, my_parent = dist[side], parent[side]
+                for v, (w, _) in adj[side][u].items():
+                    alt = d + w
+                    if alt < my_dist.get(v, inf):
+                        my_dist[v] = alt
+                        my_parent[v] = u
+                        heapq.heappush(heap, (alt, v))
+
+        if meet == -1:
+            return inf, []
+        up = [meet]
+        while parent[0][up[-1]] != -1:
+            up.append(parent[0][up[-1]])
+        up.reverse()
+        down = [meet]
+        while parent[1][down[-1]] != -1:
+            down.append(parent[1][down[-1]])
+
+        path = [src]
+        for a, b in zip(up + down[1:], up[1:] + down[1:]):
+            self._unpack(a, b, path)
+        return best, path
+
+    def _upward(self, start, adj):
+        """Complete upward Dijkstra from start: {index: distance} over adj."""
+        dist = {start: 0}
+        heap = [(0, start)]
+        while heap:
+            d, u = heapq.heappop(heap)
+            if d > dist[u]:
+                continue
+            for v, (w, _) in adj[u].items():
+                alt = d + w
+                if alt < dist.get(v, float('inf')):
+                    dist[v] = alt
+                    heapq.heappush(heap, (alt, v))
+        return dist
+
+    def distance_table(self, sources, targets):
+        '''
+        Many-to-many shortest distances with buckets.
+
+        1. Run one backward upward search per target and leave (target, distance) in the bucket of every vertex it reaches.
+        2. Run one forward upward search per source and, at every vertex it reaches, combine its distance with the bucket entries.
+        The upward searches are tiny, so the whole table costs |sources| + |targets| searches instead of |sources| full ones.
+
+        parameters:
+            sources, targets: lists of indices.
+
+        returns:
+            table: list of rows, table[i][j] is the distance from sources[i] to targets[j] (inf if unreachable).
+        '''
+        buckets = {}
+        for j, t in enumerate(targets):
+            for v, d in self._upward(t, self.up_in).items():
+                buckets.setdefault(v, []).append((j, d))
+
+        table = []
+        for s in sources:
+            row = [float('inf')] * len(targets)
+            for v, d in self._upward(s, self.up_out).items():
+                for j, d_back in buckets.get(v, ()):
+                    if d + d_back < row[j]:
+                        row[j] = d + d_back
+            table.append(row)
+        return table
+
+    def _edge(self, a, b):
+        if self.rank[a] < self.rank[b]:
+            return self.up_out[a][b]
+        return self.up_in[b][a]
+
+    def _unpack(self, a, b, path):
+        """Append the original vertices of the (possibly shortcut) edge a -> b, without a."""
+        stack = [(a, b)]
+        while stack:
+            a, b = stack.pop()
+            middle = self._edge(a, b)[1]
+            if middle == -1:
+                path.append(b)
+            else:
+                stack.append((middle, b))
+                stack.append((a, middle))
+
+    def shortest_path(self, origin_id, destination_id):
+        """Shortest path between two vertex ids as (cost, [ids]), or (inf, []) if unreachable."""
+        src, dst = self.index_of(origin_id), self.index_of(destination_id)
+        if src is None or dst is None:
+            raise KeyError(origin_id if src is None else destination_id)
+        cost, path = self.query(src, dst)
+        return cost, [self._ids[i] for i in path]
+
+    def to_dict(self):
+        """Plain-data form (lists, tuples and numbers) that from_dict() can load back."""
+        return {
+            'ids': list(self._ids),
+            'rank': list(self.rank),
+            'up_out': [[(x, w, m) for x, (w, m) in adj.items()] for adj in self.up_out],
+            'up_in': [[(u, w, m) for u, (w, m) in adj.items()] for adj in self.up_in],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        up_out = [{x: (w, m) for x, w, m in adj} for adj in data['up_out']]
+        up_in = [{u: (w, m) for u, w, m in adj} for adj in data['up_in']]
+        return cls(list(data['ids']), list(data['rank']), up_out, up_in)
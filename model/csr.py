@@ -0,0 +1,298 @@
+import heapq
+from array import array
+from collections import deque
+from model.mst import kruskal
+from model.traversal import bfs_levels, component_labels, kahn_order
+
+
+class CSRGraph:
+    """Frozen, array-backed adjacency of a graph in CSR layout.
+
+    Vertices are numbered 0..n-1 in the order of graph.vertices(). The edges
+    leaving vertex i are targets[offsets[i]:offsets[i + 1]], with matching
+    weights. Undirected edges are stored in both directions. Directed graphs
+    also keep the incoming adjacency (in_offsets, in_targets, in_weights).
+
+    Do not call constructor directly. Use Graph's compile().
+    """
+    __slots__ = ('_vertices', '_position', '_by_id', '_directed',
+                 'offsets', 'targets', 'weights',
+                 'in_offsets', 'in_targets', 'in_weights')
+
+    def __init__(self, graph):
+        self._vertices = list(graph.vertices())
+        self._position = {v: i for i, v in enumerate(self._vertices)}
+        self._by_id = {str(v.element()): i for i, v in enumerate(self._vertices)}
+        self._directed = graph.is_directed()
+
+        out = self._build(graph, outgoing=True)
+        self.offsets, self.targets, self.weights = out
+        if self._directed:
+            self.in_offsets, self.in_targets, self.in_weights = self._build(graph, outgoing=False)
+        else:
+            self.in_offsets, self.in_targets, self.in_weights = out
+
+    def _build(self, graph, outgoing):
+        position = self._position
+        offsets = array('l', [0])
+        targets = array('l')
+        costs = []
+        for v in self._vertices:
+            for e in graph.incident_edges(v, outgoing):
+                targets.append(position[e.opposite(v)])
+                costs.append(e.element())
+            offsets.append(len(targets))
+        typecode = 'q' if all(isinstance(w, int) for w in costs) else 'd'
+        return offsets, targets, array(typecode, costs)
+
+    def __len__(self):
+        return len(self._vertices)
+
+    def is_directed(self):
+        return self._directed
+
+    def num_edges(self):
+        """Return the number of edges (undirected edges are counted once)."""
+        total = len(self.targets)
+        return total if self._directed else total // 2
+
+    def vertex(self, i):
+        """Return the Vertex with index i."""
+        return self._vertices[i]
+
+    def index(self, v):
+        """Return the index of Vertex v."""
+        return self._position[v]
+
+    def index_of(self, vertex_id):
+        """Return the index of the vertex whose element is vertex_id, or None."""
+        return self._by_id.get(str(vertex_id))
+
+    def vertex_id(self, i):
+        """Return the element of vertex i as a string."""
+        return str(self._vertices[i].element())
+
+    def neighbors(self, i, outgoing=True):
+        """Return an iteration of (j, weight) pairs adjacent to vertex i."""
+        if outgoing:
+            offsets, targets, weights = self.offsets, self.targets, self.weights
+        else:
+            offsets, targets, weights = self.in_offsets, self.in_targets, self.in_weights
+        lo, hi = offsets[i], offsets[i + 1]
+        return zip(targets[lo:hi], weights[lo:hi])
+
+    def edge_list(self):
+        """Return the edges as (u, v, weight) index triples.
+
+        Undirected edges are listed once, with u < v.
+        """
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        edges = []
+        for u in range(len(self._vertices)):
+            for k in range(offsets[u], offsets[u + 1]):
+                v = targets[k]
+                if self._directed or u < v:
+                    edges.append((u, v, weights[k]))
+        return edges
+
+    def dijkstra_shortest_paths(self, src):
+        '''
+        Dijkstra's algorithm over the CSR arrays.
+
+        parameters:
+            src: index of the source vertex.
+
+        returns:
+            dist: list with the shortest distance from src to every index (inf if unreachable).
+            parent: list with the previous index on a shortest path (-1 for src and unreachable).
+        '''
+        n = len(self._vertices)
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        dist = [float('inf')] * n
+        parent = [-1] * n
+        done = [False] * n
+        dist[src] = 0
+        heap = [(0, src)]
+
+        while heap:
+            d, u = heapq.heappop(heap)
+            if done[u]:
+                continue
+            done[u] = True
+            for k in range(offsets[u], offsets[u + 1]):
+                v = targets[k]
+                alt = d + weights[k]
+                if alt < dist[v]:
+                    dist[v] = alt
+                    parent[v] = u
+                    heapq.heappush(heap, (alt, v))
+
+        return dist, parent
+
+    def bidirectional_dijkstra(self, src, dst, max_cost=float('inf')):
+        '''
+        Point-to-point Dijkstra that searches forward from src and backward from dst at the same time.
+
+        The side with the smaller heap top advances. Every relaxed vertex already
+        reached by the other side gives a candidate path. The search stops as soon
+        as the two heap tops add up to at least the best candidate, so usually
+        far fewer vertices are settled than with a full single-source tree.
+
+        parameters:
+            src, dst: indices of the endpoints.
+            max_cost: labels above it are pruned; a path costlier than it is not returned.
+
+        returns:
+            (cost, path) with path as a list of indices, or (inf, []) if there is none.
+        '''
+        inf = float('inf')
+        if src == dst:
+            return 0, [src]
+        n = len(self._vertices)
+        sides = (
+            (self.offsets, self.targets, self.weights),
+            (self.in_offsets, self.in_targets, self.in_weights),
+        )
+        dist = ([inf] * n, [inf] * n)
+        parent = ([-1] * n, [-1] * n)
+        done = ([False] * n, [False] * n)
+        heaps = ([(0, src)], [(0, dst)])
+        dist[0][src] = dist[1][dst] = 0
+        best, meet = inf, -1
+
+        while heaps[0] and heaps[1]:
+            if heaps[0][0][0] + heaps[1][0][0] >= best:
+                break
+            side = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+            d, u = heapq.heappop(heaps[side])
+            if done[side][u]:
+                continue
+            done[side][u] = True
+            offsets, targets, weights = sides[side]
+            my_dist, other_dist, my_parent = dist[side], dist[1 - side], parent[side]
+            for k in range(offsets[u], offsets[u + 1]):
+                v = targets[k]
+                alt = d + weights[k]
+                if alt < my_dist[v] and alt <= max_cost:
+                    my_dist[v] = alt
+                    my_parent[v] = u
+                    heapq.heappush(heaps[side], (alt, v))
+                if my_dist[v] + other_dist[v] < best:
+                    best, meet = my_dist[v] + other_dist[v], v
+
+        if meet == -1 or best > max_cost:
+            return inf, []
+        path = [meet]
+        while path[-1] != src:
+            path.append(parent[0][path[-1]])
+        path.reverse()
+        v = meet
+        while v != dst:
+            v = parent[1][v]
+            path.append(v)
+        return best, path
+
+    def a_star(self, src, dst, heuristic=None, max_cost=float('inf')):
+        '''
+        A* search from src to dst over the CSR arrays.
+
+        parameters:
+            src, dst: indices of the endpoints.
+            heuristic: indexable (list or lazy sequence) with an admissible lower
+                bound of the cost from every index to dst. None means all zeros,
+                which is plain Dijkstra.
+            max_cost: labels whose cost plus heuristic exceed it are pruned.
+
+        returns:
+            (cost, path) with path as a list of indices, or (inf, []) if dst
+            cannot be reached within max_cost.
+        '''
+        n = len(self._vertices)
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        h = heuristic if heuristic is not None else [0] * n
+        dist = [float('inf')] * n
+        parent = [-1] * n
+        done = [False] * n
+        dist[src] = 0
+        heap = [(h[src], src)]
+
+        while heap:
+            _, u = heapq.heappop(heap)
+            if done[u]:
+                continue
+            if u == dst:
+                path = [dst]
+                while path[-1] != src:
+                    path.append(parent[path[-1]])
+                return dist[dst], path[::-1]
+            done[u] = True
+            d = dist[u]
+            for k in range(offsets[u], offsets[u + 1]):
+                v = targets[k]
+                alt = d + weights[k]
+                if alt < dist[v] and alt + h[v] <= max_cost:
+                    dist[v] = alt
+                    parent[v] = u
+                    heapq.heappush(heap, (alt + h[v], v))
+
+        return float('inf'), []
+
+    def bfs(self, start):
+        """Generate the indices reachable from start in breadth-first order."""
+        offsets, targets = self.offsets, self.targets
+        visited = [False] * len(self._vertices)
+        visited[start] = True
+        queue = deque([start])
+        while queue:
+            u = queue.popleft()
+            yield u
+            for k in range(offsets[u], offsets[u + 1]):
+                v = targets[k]
+                if not visited[v]:
+                    visited[v] = True
+                    queue.append(v)
+
+    def bfs_levels(self, sources):
+        """Level-synchronous (multi-source) BFS: (dist, parent) lists, see model.traversal.bfs_levels."""
+        return bfs_levels(self.offsets, self.targets, sources)
+
+    def connected_components(self):
+        """Component labels (weak components if directed) as (labels, count)."""
+        if self._directed:
+            return component_labels(self.offsets, self.targets, self.in_offsets, self.in_targets)
+        return component_labels(self.offsets, self.targets)
+
+    def topological_order(self):
+        """Indices in topological order (Kahn). Raises ValueError if the graph has a cycle."""
+        return kahn_order(self.offsets, self.targets)
+
+    def dfs(self, start):
+        """Generate the indices reachable from start in depth-first preorder."""
+        offsets, targets = self.offsets, self.targets
+        visited = [False] * len(self._vertices)
+        visited[start] = True
+        yield start
+        # pila de (vertice, proxima posicion en su lista de adyacencia)
+        stack = [(start, offsets[start])]
+        while stack:
+            u, k = stack[-1]
+            end = offsets[u + 1]
+            while k < end and visited[targets[k]]:
+                k += 1
+            if k == end:
+                stack.pop()
+                continue
+            stack[-1] = (u, k + 1)
+            v = targets[k]
+            visited[v] = True
+            yield v
+            stack.append((v, offsets[v]))
+
+    def kruskal_mst(self):
+        '''
+        Kruskal's algorithm over the CSR edge list (see model.mst.kruskal).
+
+        returns:
+            mst: list of (u, v, weight) index triples of a minimum spanning forest.
+        '''
+        return kruskal(len(self._vertices), self.edge_list())
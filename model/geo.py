@@ -0,0 +1,67 @@
+from math import radians, sin, cos, asin, sqrt
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(a, b):
+    """Great-circle distance in km between two (lat, lon) points given in degrees."""
+    lat1, lon1 = radians(a[0]), radians(a[1])
+    lat2, lon2 = radians(b[0]), radians(b[1])
+    h = sin((lat2 - lat1) / 2) ** 2 + cos(lat1) * cos(lat2) * sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * asin(min(1.0, sqrt(h)))
+
+
+def distance_scale(csr, coords):
+    '''
+    Largest factor k such that weight >= k * haversine_km(u, v) on every edge.
+
+    Multiplying the straight-line distance by k turns it into a lower bound of
+    the route cost in edge-weight units, so k * haversine is an admissible A*
+    heuristic (great-circle distance obeys the triangle inequality).
+
+    parameters:
+        csr: the compiled CSRGraph.
+        coords: dict {vertex id: (lat, lon)}.
+
+    returns:
+        k, or None if some vertex has no coordinates.
+    '''
+    points = [coords.get(csr.vertex_id(i)) for i in range(len(csr))]
+    if any(p is None for p in points):
+        return None
+    scale = float('inf')
+    for u, v, w in csr.edge_list():
+        d = haversine_km(points[u], points[v])
+        if d > 0:
+            scale = min(scale, w / d)
+    return 0.0 if scale == float('inf') else scale
+
+
+class _LazyHeuristic:
+    """Scaled haversine lower bound to a fixed target, computed on first access per index."""
+
+    def __init__(self, csr, target, coords, scale):
+        self._csr = csr
+        self._target = target
+        self._coords = coords
+        self._scale = scale
+        self._values = [None] * len(csr)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __getitem__(self, i):
+        value = self._values[i]
+        if value is None:
+            value = self._scale * haversine_km(self._coords[self._csr.vertex_id(i)], self._target)
+            self._values[i] = value
+        return value
+
+
+def heuristic_to(csr, dst, coords, scale):
+    """Indexable scaled haversine lower bound from every index to dst.
+
+    Values are computed lazily, once per vertex the search actually touches,
+    so a short query on a large graph does not pay for every vertex.
+    """
+    return _LazyHeuristic(csr, coords[csr.vertex_id(dst)], coords, scale)
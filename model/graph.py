@@ -1,17 +1,31 @@
+from collections import OrderedDict
 from model.vertex import Vertex
 from model.edge import Edge
+from model.csr import CSRGraph
+from model.ch import ContractionHierarchy
 
 class Graph:
+    TREE_CACHE_SIZE = 16  # arboles de caminos mas cortos memorizados por grafo
+
     def __init__(self, directed=False):
         self._outgoing = {}
         self._incoming = {} if directed else self._outgoing
         self._directed = directed
+        self._version = 0         # se incrementa en cada modificacion del grafo
+        self._compiled = None     # (version, CSRGraph)
+        self._hierarchy = None    # (version, ContractionHierarchy)
+        self._trees = OrderedDict()  # LRU {vertex: (dist, prev)} valido para _tree_version
+        self._tree_version = 0
 
     def is_directed(self):
         return self._directed
 
+    def version(self):
+        return self._version
+
     def insert_vertex(self, element):
         v = Vertex(element)
+        self._version += 1
         self._outgoing[v] = {}
         if self._directed:
             self._incoming[v] = {}
@@ -19,12 +33,14 @@ class Graph:
 
     def insert_edge(self, u, v, element):
         e = Edge(u, v, element)
+        self._version += 1
         self._outgoing[u][v] = e
         self._incoming[v][u] = e
         return e
 
     def remove_edge(self, u, v):
         if u in self._outgoing and v in self._outgoing[u]:
+            self._version += 1
             del self._outgoing[u][v]
             del self._incoming[v][u]
 
@@ -33,6 +49,7 @@ class Graph:
             self.remove_edge(v, u)
         for u in list(self._incoming.get(v, {})):
             self.remove_edge(u, v)
+        self._version += 1
         self._outgoing.pop(v, None)
         if self._directed:
             self._incoming.pop(v, None)
@@ -59,3 +76,44 @@ class Graph:
     def incident_edges(self, v, outgoing=True):
         adj = self._outgoing if outgoing else self._incoming
         return adj[v].values()
+
+    def compile(self):
+        # representacion CSR congelada; se reconstruye tras cualquier modificacion
+        if self._compiled is None or self._compiled[0] != self._version:
+            self._compiled = (self._version, CSRGraph(self))
+        return self._compiled[1]
+
+    def contraction_hierarchy(self):
+        # preprocesamiento opcional para muchas consultas punto a punto sobre un grafo estatico;
+        # se construye una vez por version (to_dict()/from_dict() para cachearlo fuera del proceso)
+        if self._hierarchy is None or self._hierarchy[0] != self._version:
+            self._hierarchy = (self._version, ContractionHierarchy.build(self.compile()))
+        return self._hierarchy[1]
+
+    def shortest_path_tree(self, src):
+        # Arbol de caminos mas cortos desde src: (dist, prev) con vertices como claves,
+        # prev[v] es None para src y los inalcanzables. Los arboles se memorizan en un
+        # LRU por fuente y se descartan cuando cambia la version del grafo.
+        # Los diccionarios retornados son compartidos, no deben modificarse.
+        if self._tree_version != self._version:
+            self._trees.clear()
+            self._tree_version = self._version
+
+        tree = self._trees.get(src)
+        if tree is not None:
+            self._trees.move_to_end(src)
+            return tree
+
+        csr = self.compile()
+        dist_list, parent = csr.dijkstra_shortest_paths(csr.index(src))
+        dist, prev = {}, {}
+        for i, d in enumerate(dist_list):
+            v = csr.vertex(i)
+            dist[v] = d
+            prev[v] = csr.vertex(parent[i]) if parent[i] != -1 else None
+
+        tree = (dist, prev)
+        self._trees[src] = tree
+        if len(self._trees) > self.TREE_CACHE_SIZE:
+            self._trees.popitem(last=False)
+        return tree
@@ -1,30 +1,17 @@
 from model.vertex import Vertex
-from model.graph import Graph
 from model.edge import Edge
-from model.route_manager import RouteManager
+from model.nx_adapter import build_route_manager
 
 
-def recibir_datos_simulacion_nx(G_nx, n_orders):
-    """Recibe un grafo NetworkX y realiza simulación de rutas."""
-    print("=== Enrutador de drones con recarga ===")
-
-    graph = Graph(directed=False)
-    node_map = {}
-
-    for node in G_nx.nodes:
-        v = graph.insert_vertex(str(node))
-        node_map[node] = v
+def recibir_datos_simulacion_nx(G_nx, n_orders, route_manager=None):
+    """Recibe un grafo NetworkX y realiza simulación de rutas.
 
-    for u, v, data in G_nx.edges(data=True):
-        weight = data.get("weight", 1)  # Peso por defecto
-        graph.insert_edge(node_map[u], node_map[v], weight)
-
-    route_manager = RouteManager(graph)
+    route_manager permite reutilizar el enrutador ya construido para G_nx.
+    """
+    print("=== Enrutador de drones con recarga ===")
 
-    # Agregar estaciones de recarga
-    for node, data in G_nx.nodes(data=True):
-        if data.get("role") == "🔋 Recarga":
-            route_manager.add_recharge_station(str(node))
+    if route_manager is None:
+        route_manager = build_route_manager(G_nx)
 
     # Buscar un almacén y un cliente
     almacen = next((str(n) for n, d in G_nx.nodes(data=True) if d["role"] == "📦 Almacenamiento"), None)
@@ -0,0 +1,75 @@
+def kruskal(n, edges):
+    '''
+    Kruskal's algorithm over a plain edge list.
+
+    1. Sort the edges by weight once.
+    2. Scan them with an array-based union-find (union by size, path halving)
+       and keep every edge that joins two different components.
+    3. Stop after n - 1 edges.
+
+    parameters:
+        n: number of vertices, numbered 0..n-1.
+        edges: list of (u, v, weight) triples (e.g. CSRGraph.edge_list()).
+
+    returns:
+        mst: list of (u, v, weight) triples of a minimum spanning forest.
+    '''
+    parent = list(range(n))
+    size = [1] * n
+    mst = []
+    for u, v, w in sorted(edges, key=lambda e: e[2]):
+        ru, rv = u, v
+        while parent[ru] != ru:
+            parent[ru] = parent[parent[ru]]
+            ru = parent[ru]
+        while parent[rv] != rv:
+            parent[rv] = parent[parent[rv]]
+            rv = parent[rv]
+        if ru == rv:
+            continue
+        if size[ru] < size[rv]:
+            ru, rv = rv, ru
+        parent[rv] = ru
+        size[ru] += size[rv]
+        mst.append((u, v, w))
+        if len(mst) == n - 1:
+            break
+    return mst
+
+
+def prim_dense(weights):
+    '''
+    Prim's algorithm on a dense weight matrix, O(n^2) with NumPy row updates.
+
+    Better than Kruskal when the graph is (nearly) complete, since it never
+    materializes or sorts the n(n-1)/2 edges.
+
+    parameters:
+        weights: n x n symmetric array, np.inf where there is no edge.
+
+    returns:
+        mst: list of (u, v, weight) triples of a minimum spanning forest.
+    '''
+    import numpy as np  # only Prim needs NumPy; Kruskal (used by CSRGraph) stays dependency-free
+
+    weights = np.asarray(weights, dtype=float)
+    n = len(weights)
+    in_tree = np.zeros(n, dtype=bool)
+    dist = np.full(n, np.inf)
+    parent = np.full(n, -1, dtype=np.int64)
+    mst = []
+
+    for _ in range(n):
+        candidates = np.where(in_tree, np.inf, dist)
+        u = int(np.argmin(candidates))
+        if np.isinf(candidates[u]):
+            # nothing reachable from the current tree: start a new one
+            u = int(np.flatnonzero(~in_tree)[0])
+        else:
+            mst.append((int(parent[u]), u, weights[parent[u], u].item()))
+        in_tree[u] = True
+        better = (weights[u] < dist) & ~in_tree
+        dist[better] = weights[u][better]
+        parent[better] = u
+
+    return mst
@@ -0,0 +1,73 @@
+from model.geo import haversine_km
+from model.prufer import make_rng, random_tree
+from model.traversal import is_connected
+
+
+def random_connected_edges(n, m, rng=None):
+    '''
+    Connected simple graph on 0..n-1 with exactly m edges.
+
+    1. Start from a uniformly random spanning tree (Prüfer decoding, n - 1 edges), so the graph is connected.
+    2. Sparse case: draw random pairs and keep the new ones, checking a set of taken pairs.
+       Each draw is O(1) and, while at most half of the pairs are taken, needs fewer than 2 tries on average.
+    3. Dense case (more than half of all pairs): list the free pairs once and take a random sample of them.
+
+    parameters:
+        n: number of vertices.
+        m: number of edges, clipped to [n - 1, n(n - 1) / 2].
+        rng: random.Random, int seed or None (random module).
+
+    returns:
+        edges: list of (u, v) pairs with u < v.
+    '''
+    rng = make_rng(rng)
+    if n < 2:
+        return []
+    max_edges = n * (n - 1) // 2
+    m = max(n - 1, min(m, max_edges))
+
+    taken = {(u, v) if u < v else (v, u) for u, v in random_tree(n, rng)}
+    extra = m - len(taken)
+    if extra <= (max_edges - len(taken)) // 2:
+        edges = list(taken)
+        while extra:
+            u, v = rng.randrange(n), rng.randrange(n)
+            if u == v:
+                continue
+            pair = (u, v) if u < v else (v, u)
+            if pair not in taken:
+                taken.add(pair)
+                edges.append(pair)
+                extra -= 1
+        return edges
+
+    free = [(u, v) for u in range(n) for v in range(u + 1, n) if (u, v) not in taken]
+    return list(taken) + rng.sample(free, extra)
+
+
+def generate_network(n, m, coords=None, weight_range=(1, 20), rng=None):
+    '''
+    Weighted connected network on 0..n-1 with exactly m edges (see random_connected_edges).
+
+    parameters:
+        n, m: number of vertices and edges.
+        coords: optional list of (lat, lon) per vertex. When given, weights are geometric:
+                the haversine length of each edge mapped linearly onto weight_range
+                (the longest edge gets the maximum weight).
+        weight_range: (min, max) integer weights. Without coords they are uniform random.
+        rng: random.Random, int seed or None (random module).
+
+    returns:
+        edges: list of (u, v, weight) triples.
+    '''
+    rng = make_rng(rng)
+    lo, hi = weight_range
+    pairs = random_connected_edges(n, m, rng)
+    if not is_connected(n, pairs):
+        raise ValueError("Generated network is not connected")
+    if coords is None:
+        return [(u, v, rng.randint(lo, hi)) for u, v in pairs]
+
+    lengths = [haversine_km(coords[u], coords[v]) for u, v in pairs]
+    longest = max(lengths, default=0) or 1
+    return [(u, v, lo + round((hi - lo) * d / longest)) for (u, v), d in zip(pairs, lengths)]
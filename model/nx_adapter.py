@@ -0,0 +1,33 @@
+from model.graph import Graph
+from model.route_manager import RouteManager
+
+RECHARGE_ROLE = "🔋 Recarga"
+
+
+def graph_fingerprint(G_nx):
+    """Huella de un grafo NetworkX: nodos con su rol y aristas con su peso."""
+    nodes = sorted((str(n), str(d.get("role"))) for n, d in G_nx.nodes(data=True))
+    edges = []
+    for u, v, data in G_nx.edges(data=True):
+        u, v = str(u), str(v)
+        if not G_nx.is_directed() and v < u:
+            u, v = v, u
+        edges.append((u, v, data.get("weight", 1)))
+    edges.sort()
+    return hash((G_nx.is_directed(), tuple(nodes), tuple(edges)))
+
+
+def build_route_manager(G_nx, recharge_role=RECHARGE_ROLE):
+    """Convierte un grafo NetworkX en un Graph de enrutamiento con sus estaciones de recarga."""
+    graph = Graph(directed=G_nx.is_directed())
+    node_map = {node: graph.insert_vertex(str(node)) for node in G_nx.nodes}
+
+    for u, v, data in G_nx.edges(data=True):
+        graph.insert_edge(node_map[u], node_map[v], data.get("weight", 1))  # Peso por defecto
+
+    route_manager = RouteManager(graph)
+    for node, data in G_nx.nodes(data=True):
+        if data.get("role") == recharge_role:
+            route_manager.add_recharge_station(str(node))
+
+    return route_manager
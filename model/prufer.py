@@ -0,0 +1,128 @@
+import random
+import time
+
+
+def make_rng(seed=None):
+    """random.Random for an int seed, the rng itself if one is given, or the random module for None."""
+    if seed is None:
+        return random
+    if isinstance(seed, int):
+        return random.Random(seed)
+    return seed
+
+
+def decode(sequence):
+    '''
+    Tree encoded by a Prüfer sequence, in O(n).
+
+    Instead of a sorted list (or heap) of leaves it keeps a pointer to the
+    smallest leaf not used yet. When a vertex becomes a leaf and is smaller
+    than the pointer, it is the next leaf right away; otherwise the pointer
+    moves forward. The pointer only ever moves forward, so the whole decode
+    is linear.
+
+    parameters:
+        sequence: list of n - 2 vertices in 0..n-1.
+
+    returns:
+        edges: list of the n - 1 (leaf, vertex) edges of the tree.
+    '''
+    n = len(sequence) + 2
+    degree = [1] * n
+    for v in sequence:
+        degree[v] += 1
+
+    ptr = 0
+    while degree[ptr] != 1:
+        ptr += 1
+    leaf = ptr
+    edges = []
+    for v in sequence:
+        edges.append((leaf, v))
+        degree[v] -= 1
+        if degree[v] == 1 and v < ptr:
+            leaf = v
+        else:
+            ptr += 1
+            while degree[ptr] != 1:
+                ptr += 1
+            leaf = ptr
+    edges.append((leaf, n - 1))
+    return edges
+
+
+def encode(n, edges):
+    '''
+    Prüfer sequence of a tree on 0..n-1, in O(n) (inverse of decode()).
+
+    parameters:
+        n: number of vertices (at least 2).
+        edges: the n - 1 edges of the tree as (u, v) pairs.
+
+    returns:
+        sequence: list of n - 2 vertices.
+    '''
+    adj = [[] for _ in range(n)]
+    for u, v in edges:
+        adj[u].append(v)
+        adj[v].append(u)
+
+    # padre de cada vertice con la raiz en n - 1 (DFS iterativo)
+    parent = [-1] * n
+    seen = [False] * n
+    seen[n - 1] = True
+    stack = [n - 1]
+    while stack:
+        u = stack.pop()
+        for v in adj[u]:
+            if not seen[v]:
+                seen[v] = True
+                parent[v] = u
+                stack.append(v)
+
+    degree = [len(a) for a in adj]
+    ptr = 0
+    while degree[ptr] != 1:
+        ptr += 1
+    leaf = ptr
+    sequence = []
+    for _ in range(n - 2):
+        v = parent[leaf]
+        sequence.append(v)
+        degree[v] -= 1
+        if degree[v] == 1 and v < ptr:
+            leaf = v
+        else:
+            ptr += 1
+            while degree[ptr] != 1:
+                ptr += 1
+            leaf = ptr
+    return sequence
+
+
+def random_sequence(n, rng=None):
+    """Uniform random Prüfer sequence for a tree on n vertices."""
+    rng = make_rng(rng)
+    return [rng.randrange(n) for _ in range(n - 2)]
+
+
+def random_tree(n, rng=None):
+    """Edges of a uniformly random labelled tree on 0..n-1 (every tree equally likely)."""
+    if n <= 1:
+        return []
+    return decode(random_sequence(n, rng))
+
+
+def benchmark(sizes=(10**3, 10**4, 10**5, 10**6), seed=0):
+    """Seconds to draw and decode a random tree of each size, as {n: seconds}."""
+    timings = {}
+    for n in sizes:
+        start = time.perf_counter()
+        random_tree(n, seed)
+        timings[n] = time.perf_counter() - start
+    return timings
+
+
+if __name__ == '__main__':
+    for n, seconds in benchmark().items():
+        print(f"n={n:>8}: {seconds:.3f} s")
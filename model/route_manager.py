@@ -1,45 +1,113 @@
-from collections import deque
+import heapq
+import math
+from bisect import bisect_right
+from collections import OrderedDict
 from model.graph import Graph
 from model.vertex import Vertex
 from model.edge import Edge
+from model.traversal import adjacency, component_labels
+
+
+class BatteryProfile:
+    """Funcion escalonada battery_limit -> resultado de find_route_with_recharge para un par origen/destino.
+
+    pieces es una lista ascendente de (desde, hasta, resultado): el resultado es
+    optimo para todo limite de bateria en [desde, hasta]; None indica que no hay
+    ruta. Se construye con RouteManager.battery_profile().
+    """
+    def __init__(self, pieces):
+        self.pieces = pieces
+        self._starts = [start for start, _, _ in pieces]
+
+    def __len__(self):
+        return len(self.pieces)
+
+    def __iter__(self):
+        return iter(self.pieces)
+
+    def breakpoints(self):
+        """Limites de bateria donde cambia el resultado."""
+        return self._starts[1:]
+
+    def at(self, battery_limit):
+        """Resultado (o None si no hay ruta) para battery_limit, sin buscar de nuevo."""
+        i = bisect_right(self._starts, battery_limit) - 1
+        if i < 0 or battery_limit > self.pieces[i][1]:
+            raise ValueError(f"Limite de bateria fuera del perfil: {battery_limit}")
+        return self.pieces[i][2]
 
 
 class RouteManager:
+    RESULT_CACHE_SIZE = 1024  # resultados de find_route_with_recharge memorizados (LRU)
+    FEASIBILITY_CACHE_SIZE = 8  # indices de factibilidad memorizados (LRU por limite de bateria)
+
     def __init__(self, graph):
 
         #Inicializar RouteManager con un grafo
         self.graph = graph
         self.recharge_stations = set()  # almacenador de las estaciones de recarga
+        self._components = None  # (csr, etiquetas de componentes conexas)
+        self._feasibility = OrderedDict()  # LRU {battery_limit: indice de factibilidad}
+        self._stations_version = 0  # se incrementa al agregar una estacion
+        self._results = OrderedDict()  # LRU {(origen, destino, bateria): resultado o None}
+        self._results_version = None   # (version del grafo, version de estaciones) de _results
+        self.cache_stats = {'hits': 0, 'misses': 0, 'evictions': 0}
         
     def add_recharge_station(self, vertex_id):
         
         #ID de los vertice de las estaciones de recarga
-        self.recharge_stations.add(vertex_id)
+        if vertex_id not in self.recharge_stations:
+            self.recharge_stations.add(vertex_id)
+            self._stations_version += 1
+        # el indice de factibilidad depende de las estaciones, se reconstruye en la proxima consulta
+        self._feasibility.clear()
         
     def find_route_with_recharge(self, origin_id, destination_id, battery_limit=50):
     # Añadir esta validación inicial
         if battery_limit <= 0:
             raise ValueError("Battery limit must be positive")
-        
-        # Modifica la búsqueda para priorizar estaciones de recarga
-        # cuando la batería sea < 20% del límite
-        warning_threshold = 0.2 * battery_limit
-        
-        # Encontrar la ruta optima y genera error si la ruta entre origen y destino no son optimas 
+
+        # Los resultados (y los pares sin ruta) se memorizan en un LRU que se vacia
+        # cuando cambia el grafo (pesos incluidos) o las estaciones de recarga.
+        # Los diccionarios retornados son compartidos, no deben modificarse.
+        version = (self.graph.version(), self._stations_version)
+        if self._results_version != version:
+            self._results.clear()
+            self._results_version = version
+
+        key = (origin_id, destination_id, battery_limit)
+        if key in self._results:
+            self._results.move_to_end(key)
+            self.cache_stats['hits'] += 1
+            result = self._results[key]
+        else:
+            self.cache_stats['misses'] += 1
+            result = self._search(origin_id, destination_id, battery_limit)
+            self._results[key] = result
+            if len(self._results) > self.RESULT_CACHE_SIZE:
+                self._results.popitem(last=False)
+                self.cache_stats['evictions'] += 1
+
+        if result is None:
+            raise ValueError("No se encontro una ruta correcta entre los vertices")
+        return result
+
+    def cache_info(self):
+        # contadores del cache de resultados y cantidad de entradas vigentes
+        return dict(self.cache_stats, size=len(self._results), max_size=self.RESULT_CACHE_SIZE)
+
+    def clear_cache(self):
+        self._results.clear()
+
+    def _search(self, origin_id, destination_id, battery_limit):
+        # Busqueda sin cache: retorna la ruta optima o None si no hay ruta entre origen y destino
         # verifica si los vertices existen en el grafo
-        origin = None
-        destination = None
-        vertices_map = {}  # mapeo de id de vertices a objetos vertex
-        
-        
-        for v in self.graph.vertices():
-            vertices_map[str(v.element())] = v
-            if str(v.element()) == str(origin_id):
-                origin = v
-            if str(v.element()) == str(destination_id):
-                destination = v
+        # (la busqueda trabaja sobre la representacion CSR compilada del grafo)
+        csr = self.graph.compile()
+        origin = csr.index_of(origin_id)
+        destination = csr.index_of(destination_id)
                 
-        if not origin or not destination:
+        if origin is None or destination is None:
             raise ValueError("Vertice no encontrado, error con el origen y destino")
             
         # en caso de que el origen sea el destino
@@ -51,140 +119,317 @@ class RouteManager:
                 'segments': [[origin_id]]
             }
             
-        # BFS
-        queue = deque()
-        
-        # Tupla de cada elemento en la cola
-        # (current_vertex, path, remaining_battery, total_cost, recharge_stops, segments)
-        queue.append((origin, [origin_id], battery_limit, 0, [], []))
-        
-        visited = {}  # para evitar ciclos: {vertex_id: (remaining_battery, total_cost)}
-        
-        best_solution = None
-        
-        
-        while queue:
-            current_vertex, path, remaining_battery, total_cost, recharge_stops, segments = queue.popleft()
-            current_id = str(current_vertex.element())
-            
-            # si se llega al destino, se guarda la solucion si es mejor que la actual
-            if current_vertex == destination:
-                if best_solution is None or total_cost < best_solution['total_cost']:
-                    # completar los ultimos segmentos
-                    completed_segments = segments.copy()
-                    if len(completed_segments) == 0:
-                        completed_segments.append([origin_id, destination_id])
-                    else:
-                        completed_segments[-1].append(destination_id)
-                        
-                    best_solution = {
-                        'path': path,
-                        'total_cost': total_cost,
-                        'recharge_stops': recharge_stops,
-                        'segments': completed_segments
-                    }
-                continue
-                
-            # Verificar si ya visitamos este nodo con mejor o igual bateria con un costo mas optimo
-            if current_id in visited:
-                stored_battery, stored_cost = visited[current_id]
-                if stored_battery >= remaining_battery and stored_cost <= total_cost:
+        # descarte en O(1) de los pares que no tienen ruta con este limite de bateria
+        if not self._is_feasible(csr, origin, destination, battery_limit):
+            return None
+        # sin componente de estaciones en comun ninguna recarga sirve: solo queda el tramo directo
+        if not self._can_recharge(csr, origin, destination, battery_limit):
+            return self._direct_route(csr, origin, destination, battery_limit)
+
+        result = self._label_setting_search(csr, origin, destination, battery_limit)
+        return self._with_origin_id(result, origin_id)
+
+    def _with_origin_id(self, result, origin_id):
+        # el primer vertice se reporta con el id tal como lo entrego el usuario
+        if result is not None:
+            result['path'][0] = origin_id
+            result['segments'][0][0] = origin_id
+        return result
+
+    def battery_profile(self, origin_id, destination_id, low=10, high=100, step=1):
+        # Resultados para todos los limites low, low + step, ..., <= high con pocas busquedas.
+        #
+        # Una ruta sigue siendo factible con cualquier limite >= su tramo critico (el
+        # tramo entre recargas mas caro), y el costo optimo no aumenta con la bateria.
+        # Entonces la ruta optima para B tambien es optima en [tramo critico, B]: se
+        # barre desde high hacia abajo saltando directo al limite anterior al tramo
+        # critico, con una busqueda por escalon en vez de una por valor. Bajo el primer
+        # limite sin ruta ya no hay ninguna.
+        #
+        # Las busquedas por etiquetas no pasan por el cache de resultados ni crean
+        # estructuras por limite.
+        csr = self.graph.compile()
+        origin = csr.index_of(origin_id)
+        destination = csr.index_of(destination_id)
+        if origin is None or destination is None:
+            raise ValueError("Vertice no encontrado, error con el origen y destino")
+
+        k = math.floor((high - low) / step)  # indice en la grilla del limite actual
+        if origin == destination:
+            return BatteryProfile([(low, low + k * step, self._search(origin_id, destination_id, low))])
+
+        pieces = []
+        while k >= 0:
+            battery_limit = low + k * step
+            result = self._label_setting_search(csr, origin, destination, battery_limit)
+            result = self._with_origin_id(result, origin_id)
+            if result is None:
+                pieces.append((low, battery_limit, None))
+                break
+            critical = max(self._path_cost(csr, segment) for segment in result['segments'])
+            pieces.append((critical, battery_limit, result))
+            k = math.ceil((critical - low) / step) - 1
+        pieces.reverse()
+        return BatteryProfile(pieces)
+
+    def _path_cost(self, csr, vertex_ids):
+        # suma de los pesos de las aristas de un camino dado por ids de vertice
+        vertices = [csr.vertex(csr.index_of(vertex_id)) for vertex_id in vertex_ids]
+        return sum(self.graph.get_edge(u, v).element() for u, v in zip(vertices, vertices[1:]))
+
+    def is_feasible(self, origin_id, destination_id, battery_limit=50):
+        # True si existe alguna ruta (con recargas) entre los vertices con este limite de bateria.
+        # En grafos no dirigidos las consultas al indice son exactas para las rutas con recargas
+        # y solo el tramo directo requiere una busqueda; en dirigidos el prechequeo solo
+        # descarta, asi que si lo pasa se confirma con la busqueda por etiquetas.
+        csr = self.graph.compile()
+        origin = csr.index_of(origin_id)
+        destination = csr.index_of(destination_id)
+        if origin is None or destination is None:
+            raise ValueError("Vertice no encontrado, error con el origen y destino")
+        if origin == destination:
+            return True
+        if not self._is_feasible(csr, origin, destination, battery_limit):
+            return False
+        if csr.is_directed():
+            return self._label_setting_search(csr, origin, destination, battery_limit) is not None
+        return self._can_recharge(csr, origin, destination, battery_limit) or \
+            self._direct_route(csr, origin, destination, battery_limit) is not None
+
+    def _is_feasible(self, csr, origin, destination, battery_limit):
+        # Prechequeo en O(1) con el indice de factibilidad del limite de bateria:
+        # 1. componentes conexas del grafo;
+        # 2. componentes del grafo con solo las aristas de peso <= battery_limit.
+        # Son condiciones necesarias: False descarta el par, True no garantiza una ruta.
+        if self._components is None or self._components[0] is not csr:
+            self._components = (csr, csr.connected_components()[0])
+        labels = self._components[1]
+        if labels[origin] != labels[destination]:
+            return False
+
+        battery_labels = self._feasibility_index(csr, battery_limit)['battery_components']
+        return battery_labels[origin] == battery_labels[destination]
+
+    def _can_recharge(self, csr, origin, destination, battery_limit):
+        # (no dirigido) True si hay una ruta con al menos una recarga: el origen llega con
+        # una carga a una estacion de alguna componente a la que tambien llega el destino.
+        # Es una consulta al indice (ver 'reach' en _feasibility_index). Si es False, la unica
+        # ruta posible es el tramo directo sin recargar (ver _direct_route).
+        # En grafos dirigidos el indice no lo decide y se retorna True.
+        if csr.is_directed():
+            return True
+        reach = self._feasibility_index(csr, battery_limit)['reach']
+        return not reach.get(origin, frozenset()).isdisjoint(reach.get(destination, ()))
+
+    def _direct_route(self, csr, origin, destination, battery_limit):
+        # camino mas corto sin recargar, solo si su costo cabe en una carga (None si no)
+        cost, path = csr.a_star(origin, destination, None, battery_limit)
+        if not path:
+            return None
+        path = [csr.vertex_id(i) for i in path]
+        return {
+            'path': path,
+            'total_cost': cost,
+            'recharge_stops': [],
+            'segments': [list(path)]
+        }
+
+    def _feasibility_index(self, csr, battery_limit):
+        # Indice por limite de bateria:
+        # - componentes del grafo con solo las aristas de peso <= battery_limit;
+        # - (no dirigido) componentes de estaciones unidas por tramos de una carga.
+        #   Un Dijkstra multi-fuente desde todas las estaciones asigna a cada vertice su
+        #   estacion mas cercana s(v) a distancia d(v); dos estaciones quedan unidas si
+        #   una arista (u, v, w) cumple d(u) + w + d(v) <= battery_limit. Cualquier
+        #   tramo s -> t de costo <= battery_limit cruza las celdas con aristas asi, por
+        #   lo que las componentes son las mismas que las del grafo de tramos entre estaciones.
+        # - (no dirigido) por vertice, las componentes de estaciones a las que llega con una
+        #   carga (ver _station_reach), para responder _can_recharge sin buscar.
+        for limit in [limit for limit, cached in self._feasibility.items() if cached['csr'] is not csr]:
+            del self._feasibility[limit]
+        index = self._feasibility.get(battery_limit)
+        if index is not None:
+            self._feasibility.move_to_end(battery_limit)
+            return index
+
+        edges = csr.edge_list()
+        short_edges = [(u, v) for u, v, w in edges if w <= battery_limit]
+        index = {
+            'csr': csr,
+            'battery_components': component_labels(*adjacency(len(csr), short_edges))[0],
+            'station_components': {},  # {estacion: componente}, solo en grafos no dirigidos
+            'reach': {},      # {vertice: componentes de estaciones a una carga}, solo en grafos no dirigidos
+        }
+
+        if not csr.is_directed():
+            stations = sorted(self._station_indices(csr))
+            position = {s: i for i, s in enumerate(stations)}
+            dist = {s: 0 for s in stations}
+            nearest = {s: s for s in stations}
+            heap = [(0, s) for s in stations]
+            offsets, targets, weights = csr.offsets, csr.targets, csr.weights
+            while heap:
+                d, u = heapq.heappop(heap)
+                if d > dist[u]:
                     continue
-            visited[current_id] = (remaining_battery, total_cost)
-            
-            # explorar vecinos
-            for neighbor in self.graph.neighbors(current_vertex):
-                neighbor_id = str(neighbor.element())
-                edge = self.graph.get_edge(current_vertex, neighbor)
-                edge_cost = edge.element() if edge else 0
-                
-                # si el vecino es una de las estaciones de recarga, se considera como opcion
-                is_recharge_station = neighbor_id in self.recharge_stations
-                
-                # se puede llegar al vecino sin recargar
-                if edge_cost <= remaining_battery:
-                    new_remaining = remaining_battery - edge_cost
-                    new_path = path + [neighbor_id]
-                    new_total_cost = total_cost + edge_cost
-                    new_recharge_stops = recharge_stops.copy()
-                    new_segments = segments.copy()
-                    
-                    # si no hay segmentos, crear el primero
-                    if len(new_segments) == 0:
-                        new_segments.append([origin_id, neighbor_id])
-                    else:
-                        # si el ultimo segmento no contiene current_id, es porque ya fue recargados
-                        if current_id not in new_segments[-1]:
-                            new_segments.append([current_id, neighbor_id])
-                        else:
-                            new_segments[-1].append(neighbor_id)
-                    
-                    queue.append((neighbor, new_path, new_remaining, new_total_cost, 
-                                new_recharge_stops, new_segments))
-                
-                # si no podemos llegar al vecino sin recargar
-                # se busca la estacion de recarga mas cercana
-                if edge_cost > remaining_battery or is_recharge_station:
-                    # si se encuentra en la estacion de recarga, recargamos
-                    if current_id in self.recharge_stations and current_id not in recharge_stops:
-                        new_remaining = battery_limit
-                        new_path = path.copy()
-                        new_total_cost = total_cost
-                        new_recharge_stops = recharge_stops + [current_id]
-                        new_segments = segments.copy()
-                        
-                        # si se recarga, en el proximo movimiento, se inicia el nuevo segmento
-                        queue.append((current_vertex, new_path, new_remaining, new_total_cost, 
-                                    new_recharge_stops, new_segments))
-                    else:
-                        # Buscar la estacion de recarga mas cercana
-                        nearest_station = self._find_nearest_recharge_station(current_vertex, battery_limit)
-                        if nearest_station:
-                            station_id = str(nearest_station.element())
-                            # agregar ruta a la estacion de recarga
-                            new_path = path + [station_id]
-                            new_recharge_stops = recharge_stops + [station_id]
-                            new_remaining = battery_limit
-                            # para simplificar, asumimos que se puede llegar con la bateraa restante
-                            new_total_cost = total_cost + edge_cost  #aproximacion
-                            new_segments = segments.copy()
-                            new_segments.append([current_id, station_id])
-                            
-                            queue.append((nearest_station, new_path, new_remaining, new_total_cost, 
-                                        new_recharge_stops, new_segments))
-        
-        if best_solution is None:
-            raise ValueError("No se encontro una ruta correcta entre los vertices")
-            
-        return best_solution
-        
-    def _find_nearest_recharge_station(self, from_vertex, battery_limit):
-        # Encontrar la estacion mas cercana segun la bateria actual.
-        
-        #vertex: vertice de la estacion de recarga mas cercana, en el caso que no se encuentre nonne
-        
-        # BFS para encontrar la estacion mas cercana
-        queue = deque()
-        queue.append((from_vertex, 0))
-        visited = set()
-        
-        while queue:
-            current_vertex, current_cost = queue.popleft()
-            current_id = str(current_vertex.element())
-            
-            if current_id in self.recharge_stations:
-                return current_vertex
-                
-            if current_id in visited:
+                for k in range(offsets[u], offsets[u + 1]):
+                    v = targets[k]
+                    alt = d + weights[k]
+                    if alt <= battery_limit and alt < dist.get(v, float('inf')):
+                        dist[v] = alt
+                        nearest[v] = nearest[u]
+                        heapq.heappush(heap, (alt, v))
+
+            links = [(position[nearest[u]], position[nearest[v]]) for u, v, w in edges
+                     if u in dist and v in dist and nearest[u] != nearest[v]
+                     and dist[u] + w + dist[v] <= battery_limit]
+            labels = component_labels(*adjacency(len(stations), links))[0]
+            index['station_components'] = {s: labels[position[s]] for s in stations}
+            index['reach'] = self._station_reach(csr, index['station_components'], battery_limit)
+
+        self._feasibility[battery_limit] = index
+        if len(self._feasibility) > self.FEASIBILITY_CACHE_SIZE:
+            self._feasibility.popitem(last=False)
+        return index
+
+    def _station_indices(self, csr):
+        # indices CSR de las estaciones de recarga registradas que existen en el grafo
+        stations = set()
+        for vertex_id in self.recharge_stations:
+            i = csr.index_of(vertex_id)
+            if i is not None:
+                stations.add(i)
+        return stations
+
+    def _label_setting_search(self, csr, origin, destination, battery_limit):
+        # Busqueda por etiquetas (label-setting) con restriccion de bateria.
+        #
+        # Cada etiqueta es un estado (vertice, costo, bateria restante, recargas)
+        # guardado en listas paralelas; el camino se reconstruye con punteros al
+        # padre, sin copiar listas en cada expansion.
+        #
+        # Por vertice se mantiene una frontera de Pareto de etiquetas no dominadas:
+        # una etiqueta domina a otra si tiene costo <=, bateria >= y recargas <=.
+        # La cola de prioridad se ordena por (costo, recargas); como los pesos no
+        # son negativos, la primera etiqueta del destino que sale de la cola es
+        # optima en costo y, a igual costo, usa el minimo de recargas.
+        offsets, targets, weights = csr.offsets, csr.targets, csr.weights
+        stations = self._station_indices(csr)
+
+        vertex_of = []   # vertice de cada etiqueta
+        cost_of = []     # costo acumulado
+        battery_of = []  # bateria restante
+        stops_of = []    # cantidad de recargas
+        parent_of = []   # etiqueta padre (-1 en el origen)
+        recharged = []   # True si la etiqueta corresponde a una recarga
+        alive = []       # False si fue dominada despues de crearse
+
+        frontier = {}    # {vertice: [etiquetas no dominadas]}
+        heap = []
+
+        def push(vertex, cost, battery, stops, parent, is_recharge):
+            labels = frontier.get(vertex, [])
+            for idx in labels:
+                if cost_of[idx] <= cost and battery_of[idx] >= battery and stops_of[idx] <= stops:
+                    return
+            survivors = []
+            for idx in labels:
+                if cost <= cost_of[idx] and battery >= battery_of[idx] and stops <= stops_of[idx]:
+                    alive[idx] = False
+                else:
+                    survivors.append(idx)
+            new_idx = len(vertex_of)
+            vertex_of.append(vertex)
+            cost_of.append(cost)
+            battery_of.append(battery)
+            stops_of.append(stops)
+            parent_of.append(parent)
+            recharged.append(is_recharge)
+            alive.append(True)
+            survivors.append(new_idx)
+            frontier[vertex] = survivors
+            heapq.heappush(heap, (cost, stops, new_idx))
+
+        push(origin, 0, battery_limit, 0, -1, False)
+
+        while heap:
+            cost, stops, idx = heapq.heappop(heap)
+            if not alive[idx]:
                 continue
-            visited.add(current_id)
-            
-            for neighbor in self.graph.neighbors(current_vertex):
-                edge = self.graph.get_edge(current_vertex, neighbor)
-                edge_cost = edge.element() if edge else 0
-                total_cost = current_cost + edge_cost
-                
-                if total_cost <= battery_limit:
-                    queue.append((neighbor, total_cost))
-                    
-        return None
\ No newline at end of file
+            current = vertex_of[idx]
+
+            # la primera etiqueta del destino en salir es la optima
+            if current == destination:
+                return self._build_result(csr, idx, vertex_of, parent_of, recharged, cost)
+
+            remaining_battery = battery_of[idx]
+
+            # en una estacion se puede recargar, solo tiene sentido si la bateria no esta llena
+            if remaining_battery < battery_limit and current in stations:
+                push(current, cost, battery_limit, stops + 1, idx, True)
+
+            # explorar vecinos alcanzables con la bateria restante
+            for k in range(offsets[current], offsets[current + 1]):
+                edge_cost = weights[k]
+                if edge_cost <= remaining_battery:
+                    push(targets[k], cost + edge_cost, remaining_battery - edge_cost, stops, idx, False)
+
+        return None
+
+    def _build_result(self, csr, label, vertex_of, parent_of, recharged, total_cost):
+        # reconstruye path, recharge_stops y segments siguiendo los punteros al padre
+        chain = []
+        idx = label
+        while idx != -1:
+            chain.append(idx)
+            idx = parent_of[idx]
+        chain.reverse()
+
+        origin_id = csr.vertex_id(vertex_of[chain[0]])
+        path = [origin_id]
+        recharge_stops = []
+        segments = [[origin_id]]
+        for idx in chain[1:]:
+            vertex_id = csr.vertex_id(vertex_of[idx])
+            if recharged[idx]:
+                # si se recarga, en el proximo movimiento se inicia el nuevo segmento
+                recharge_stops.append(vertex_id)
+                segments.append([vertex_id])
+            else:
+                path.append(vertex_id)
+                segments[-1].append(vertex_id)
+
+        return {
+            'path': path,
+            'total_cost': total_cost,
+            'recharge_stops': recharge_stops,
+            'segments': segments
+        }
+
+    def _station_reach(self, csr, station_components, battery_limit):
+        # Para cada componente de estaciones, un Dijkstra multi-fuente desde sus estaciones
+        # acotado por battery_limit marca los vertices que llegan con una carga a alguna de
+        # ellas (grafo no dirigido: la distancia es la misma en ambos sentidos).
+        # Cada bola tiene radio battery_limit, asi que el costo total es proporcional a la
+        # suma de los tamanos de las bolas y no a la cantidad de pares de vertices.
+        by_component = {}
+        for s, label in station_components.items():
+            by_component.setdefault(label, []).append(s)
+
+        offsets, targets, weights = csr.offsets, csr.targets, csr.weights
+        reach = {}
+        for label, sources in by_component.items():
+            dist = {s: 0 for s in sources}
+            heap = [(0, s) for s in sources]
+            while heap:
+                d, u = heapq.heappop(heap)
+                if d > dist[u]:
+                    continue
+                reach.setdefault(u, set()).add(label)
+                for k in range(offsets[u], offsets[u + 1]):
+                    v = targets[k]
+                    alt = d + weights[k]
+                    if alt <= battery_limit and alt < dist.get(v, float('inf')):
+                        dist[v] = alt
+                        heapq.heappush(heap, (alt, v))
+        return {v: frozenset(labels) for v, labels in reach.items()}
@@ -0,0 +1,141 @@
+from array import array
+
+
+def adjacency(n, edges):
+    '''
+    Undirected CSR arrays (offsets, targets) of an edge list, built with a counting pass.
+
+    parameters:
+        n: number of vertices, numbered 0..n-1.
+        edges: iterable of (u, v) or (u, v, weight) tuples; weights are ignored.
+
+    returns:
+        (offsets, targets): neighbours of u are targets[offsets[u]:offsets[u + 1]].
+    '''
+    edges = [(e[0], e[1]) for e in edges]
+    offsets = array('l', [0] * (n + 1))
+    for u, v in edges:
+        offsets[u + 1] += 1
+        offsets[v + 1] += 1
+    for i in range(n):
+        offsets[i + 1] += offsets[i]
+    fill = offsets[:-1]
+    targets = array('l', [0] * offsets[n])
+    for u, v in edges:
+        targets[fill[u]] = v
+        fill[u] += 1
+        targets[fill[v]] = u
+        fill[v] += 1
+    return offsets, targets
+
+
+def bfs_levels(offsets, targets, sources):
+    '''
+    Level-synchronous BFS over CSR arrays from one or more sources.
+
+    The whole frontier of level d is expanded at once into the frontier of
+    level d + 1 (two plain lists, no queue), so every vertex and edge is
+    touched once.
+
+    parameters:
+        offsets, targets: CSR arrays (see CSRGraph or adjacency()).
+        sources: index or iterable of indices, all at distance 0.
+
+    returns:
+        (dist, parent): lists indexed by vertex. dist is the number of edges from
+        the nearest source (-1 if unreachable); parent is the previous vertex on
+        that path (-1 for sources and unreachable vertices).
+    '''
+    n = len(offsets) - 1
+    if isinstance(sources, int):
+        sources = [sources]
+    dist = [-1] * n
+    parent = [-1] * n
+    frontier = []
+    for s in sources:
+        if dist[s] < 0:
+            dist[s] = 0
+            frontier.append(s)
+
+    level = 0
+    while frontier:
+        level += 1
+        next_frontier = []
+        for u in frontier:
+            for k in range(offsets[u], offsets[u + 1]):
+                v = targets[k]
+                if dist[v] < 0:
+                    dist[v] = level
+                    parent[v] = u
+                    next_frontier.append(v)
+        frontier = next_frontier
+    return dist, parent
+
+
+def component_labels(offsets, targets, in_offsets=None, in_targets=None):
+    '''
+    Connected-component labeling in O(n + m).
+
+    For directed graphs pass the incoming arrays too, so that edges are followed
+    both ways and the labels are the weakly connected components.
+
+    returns:
+        (labels, count): labels[v] in 0..count-1, numbered in order of the smallest vertex.
+    '''
+    n = len(offsets) - 1
+    sides = [(offsets, targets)]
+    if in_offsets is not None:
+        sides.append((in_offsets, in_targets))
+    labels = [-1] * n
+    count = 0
+    for start in range(n):
+        if labels[start] >= 0:
+            continue
+        labels[start] = count
+        stack = [start]
+        while stack:
+            u = stack.pop()
+            for offs, targs in sides:
+                for k in range(offs[u], offs[u + 1]):
+                    v = targs[k]
+                    if labels[v] < 0:
+                        labels[v] = count
+                        stack.append(v)
+        count += 1
+    return labels, count
+
+
+def is_connected(n, edges):
+    """True if the undirected graph on 0..n-1 with these edges is connected."""
+    return n <= 1 or component_labels(*adjacency(n, edges))[1] == 1
+
+
+def kahn_order(offsets, targets):
+    '''
+    Kahn's topological sort over directed CSR arrays.
+
+    The queue is a preallocated list with a read position, so every dequeue is O(1).
+
+    returns:
+        order: list of indices, each one before all its successors.
+
+    raises:
+        ValueError: if the graph has a cycle.
+    '''
+    n = len(offsets) - 1
+    in_degree = [0] * n
+    for k in range(offsets[n]):
+        in_degree[targets[k]] += 1
+    order = [u for u in range(n) if in_degree[u] == 0]
+    head = 0
+    while head < len(order):
+        u = order[head]
+        head += 1
+        for k in range(offsets[u], offsets[u + 1]):
+            v = targets[k]
+            in_degree[v] -= 1
+            if in_degree[v] == 0:
+                order.append(v)
+    if len(order) != n:
+        raise ValueError("Graph has a cycle. Topological sort not possible.")
+    return order
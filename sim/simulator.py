@@ -1,5 +1,4 @@
-from graph import Graph
-import heapq  #Dijkstra
+from model.graph import Graph
 import random
 
 class OrderSimulator:
@@ -54,25 +53,10 @@ class OrderSimulator:
 
     #Dijkstra
     def dijkstra(self, origen_id):
+        # el grafo memoriza el arbol por origen: con pocos almacenes,
+        # solo se calcula un Dijkstra por almacen
         origen_v = self.vertices[origen_id]['vertice']
-        dist = {v: float('inf') for v in self.grafo.vertices()}
-        prev = {v: None for v in self.grafo.vertices()}
-        dist[origen_v] = 0
-
-        pq = [(0, origen_v)]  #cola de prioridad
-
-        while pq:
-            d, u = heapq.heappop(pq)
-            if d > dist[u]: continue
-            for edge in self.grafo.incident_edges(u):
-                v = edge.opposite(u)
-                peso = edge.element()
-                if dist[u] + peso < dist[v]:
-                    dist[v] = dist[u] + peso
-                    prev[v] = u
-                    heapq.heappush(pq, (dist[v], v))
-
-        return dist, prev
+        return self.grafo.shortest_path_tree(origen_v)
 
     # Ruta
     def reconstruir_camino(self, prev, destino_v):
@@ -1,35 +1,152 @@
+_FNV_OFFSET = 0xcbf29ce484222325   # Base del hash FNV-1a de 64 bits
+_FNV_PRIME = 0x100000001b3           # Primo multiplicador de FNV-1a de 64 bits
+_MASK64 = 0xFFFFFFFFFFFFFFFF
+
+_EMPTY = object()      # Marca de casilla nunca usada (corta la secuencia de sondeo)
+_DELETED = object()    # Marca de casilla borrada (lápida): la secuencia de sondeo continúa
+
+
+def fnv1a(key):
+    """Hash FNV-1a de 64 bits sobre los bytes UTF-8 de str(key)."""
+    h = _FNV_OFFSET
+    for byte in str(key).encode('utf-8'):
+        h = ((h ^ byte) * _FNV_PRIME) & _MASK64
+    return h
+
+
 class HashMap:
+    """HashMap con direccionamiento abierto (sondeo lineal) sobre arreglos paralelos.
+
+    Las claves, valores y hashes se guardan en tres listas del mismo tamaño
+    (una potencia de 2). La tabla se duplica cuando las casillas ocupadas más
+    las lápidas superan MAX_LOAD, así que put/get/delete son O(1) amortizado.
+    """
+    MAX_LOAD = 0.6
+
     def __init__(self, size=10):
-        self.size = size
-        # Inicializa la tabla con una lista de listas para manejar colisiones mediante encadenamiento (chaining)
-        self.table = [[] for _ in range(size)]
+        # size es la cantidad de claves esperada; la capacidad se ajusta para que quepan sin redimensionar
+        self._count = 0        # Claves vivas
+        self._used = 0         # Claves vivas + lápidas
+        self._allocate(self._capacity_for(size))
+
+    @classmethod
+    def _capacity_for(cls, n):
+        capacity = 8
+        while capacity * cls.MAX_LOAD < n:
+            capacity *= 2
+        return capacity
+
+    def _allocate(self, capacity):
+        self._keys = [_EMPTY] * capacity
+        self._values = [None] * capacity
+        self._hashes = [0] * capacity
+        self._mask = capacity - 1
 
     def _hash(self, key):
-        # Función hash sencilla que suma los códigos ASCII de los caracteres de la clave
-        # y luego toma el módulo del tamaño de la tabla para obtener el índice
-        return sum(ord(c) for c in key) % self.size
+        return fnv1a(key)
+
+    def _find(self, key, h):
+        """Devuelve el índice de la clave, o -1 si no está."""
+        keys, hashes, mask = self._keys, self._hashes, self._mask
+        i = h & mask
+        while True:
+            k = keys[i]
+            if k is _EMPTY:
+                return -1
+            if k is not _DELETED and hashes[i] == h and k == key:
+                return i
+            i = (i + 1) & mask
+
+    def _resize(self, capacity):
+        # Reinserta solo las claves vivas (descarta lápidas) reutilizando los hashes guardados
+        old = zip(self._keys, self._values, self._hashes)
+        self._allocate(capacity)
+        keys, values, hashes, mask = self._keys, self._values, self._hashes, self._mask
+        for k, v, h in old:
+            if k is _EMPTY or k is _DELETED:
+                continue
+            i = h & mask
+            while keys[i] is not _EMPTY:
+                i = (i + 1) & mask
+            keys[i], values[i], hashes[i] = k, v, h
+        self._used = self._count
 
     def put(self, key, value):
         # Inserta o actualiza el valor asociado a la clave en el hashmap
-        index = self._hash(key)  # Calcula el índice con la función hash
-        for pair in self.table[index]:
-            if pair[0] == key:
-                # Si la clave ya existe, actualiza el valor y retorna
-                pair[1] = value
+        h = self._hash(key)
+        keys, mask = self._keys, self._mask
+        i = h & mask
+        slot = -1  # Primera lápida encontrada, se reutiliza si la clave no existe
+        while True:
+            k = keys[i]
+            if k is _EMPTY:
+                break
+            if k is _DELETED:
+                if slot < 0:
+                    slot = i
+            elif self._hashes[i] == h and k == key:
+                self._values[i] = value  # La clave ya existe: solo se actualiza el valor
                 return
-        # Si la clave no existe, agrega un nuevo par (clave, valor) en la lista del índice
-        self.table[index].append([key, value])
+            i = (i + 1) & mask
+
+        if slot < 0:
+            slot = i
+            self._used += 1
+        keys[slot] = key
+        self._values[slot] = value
+        self._hashes[slot] = h
+        self._count += 1
+
+        if self._used > len(keys) * self.MAX_LOAD:
+            # Si hay muchas lápidas basta con limpiar; si no, se duplica la capacidad
+            capacity = len(keys)
+            if self._count > capacity * self.MAX_LOAD / 2:
+                capacity *= 2
+            self._resize(capacity)
+
+    def get(self, key, default=None):
+        # Obtiene el valor asociado a la clave, o default si no existe
+        i = self._find(key, self._hash(key))
+        return default if i < 0 else self._values[i]
+
+    def delete(self, key):
+        """Elimina la clave y devuelve su valor. Lanza KeyError si no existe."""
+        i = self._find(key, self._hash(key))
+        if i < 0:
+            raise KeyError(key)
+        value = self._values[i]
+        self._keys[i] = _DELETED
+        self._values[i] = None
+        self._count -= 1
+        return value
+
+    def update(self, pairs):
+        """Inserta en bloque desde un dict o un iterable de pares (clave, valor)."""
+        if hasattr(pairs, 'items'):
+            pairs = pairs.items()
+        else:
+            pairs = list(pairs)
+        needed = self._capacity_for(self._count + len(pairs))
+        if needed > len(self._keys):
+            self._resize(needed)  # Se reserva espacio una sola vez en vez de duplicar varias veces
+        for key, value in pairs:
+            self.put(key, value)
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, key):
+        return self._find(key, self._hash(key)) >= 0
+
+    def __iter__(self):
+        return self.keys()
 
-    def get(self, key):
-        # Obtiene el valor asociado a la clave, o None si no existe
-        index = self._hash(key)  # Calcula el índice usando la función hash
-        for pair in self.table[index]:
-            if pair[0] == key:
-                return pair[1]  # Retorna el valor encontrado
-        return None  # No se encontró la clave
+    def keys(self):
+        for key, _ in self.items():
+            yield key
 
     def items(self):
-        # Generador que recorre todas las claves y valores en la tabla
-        for bucket in self.table:
-            for key, value in bucket:
+        # Generador que recorre todas las claves y valores vivos de la tabla
+        for key, value in zip(self._keys, self._values):
+            if key is not _EMPTY and key is not _DELETED:
                 yield key, value
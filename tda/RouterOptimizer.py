@@ -1,10 +1,37 @@
+from model.geo import distance_scale, heuristic_to
+from .aggregates import RouteAggregates
+
+
 class RouteOptimizer:
-    def __init__(self, route_tracker, graph):
+    def __init__(self, route_tracker, graph, coords=None):
         self.route_tracker = route_tracker
         self.graph = graph
+        self.coords = coords or {}      # {id de nodo: (lat, lon)} para la heurística de A*
+        self._scale = None              # (versión del grafo, factor haversine -> peso)
         self.optimization_report = []
+        # Agregados por nodo que el tracker mantiene al día en cada registro
+        self.aggregates = RouteAggregates(route_tracker.nodes)
+        route_tracker.subscribe(self.aggregates)
+
+    def close(self):
+        """Desuscribe los agregados del tracker; el optimizador ya no recibe registros."""
+        if self.aggregates is not None:
+            self.route_tracker.unsubscribe(self.aggregates)
+            self.aggregates = None
+
+    def __enter__(self):
+        return self
 
-    def suggest_optimized_route(self, origin_id, destination_id):
+    def __exit__(self, *exc):
+        self.close()
+
+    def __del__(self):
+        # el tracker solo guarda los agregados, así que un optimizador descartado
+        # se recolecta y no deja trabajo extra en cada register_route
+        if getattr(self, 'aggregates', None) is not None:
+            self.close()
+
+    def suggest_optimized_route(self, origin_id, destination_id, battery_limit=None):
     # cache para rutas frecuentes
         cache_key = f"{origin_id}->{destination_id}"
         if hasattr(self, '_route_cache') and cache_key in self._route_cache:
@@ -18,36 +45,71 @@ class RouteOptimizer:
         3. calcular nueva ruta y registrarla
         """
         # 1. Buscar ruta exacta frecuente
-        exact_routes = [route for route, freq in self.route_tracker.get_most_frequent_routes(top_n=10) if route.startswith(origin_id) and route.endswith(destination_id)]
-        if exact_routes:
-            self.optimization_report.append(f"Usando ruta exacta frecuente: {exact_routes[0]}")
-            return exact_routes[0].split("→")
+        # Se consulta el trie de rutas por nodo: compara nodos completos (no prefijos de texto como "A" y "AB")
+        exact_route = self.route_tracker.get_most_frequent_route(origin_id, destination_id)
+        if exact_route:
+            route = self.route_tracker.route_nodes(exact_route[0])
+            self.optimization_report.append(f"Usando ruta exacta frecuente: {'→'.join(route)}")
+            return route
 
         # 2. Buscar rutas parciales y combinar segmentos
         # Obtener rutas frecuentes que contienen origen y destino
-        partial_routes = [route for route, freq in self.route_tracker.get_most_frequent_routes(top_n=20) if origin_id in route and destination_id in route]
+        # (se comparan ids de nodo, no subcadenas del texto de la ruta)
+        nodes = self.route_tracker.nodes
+        origin_key, destination_key = nodes.lookup(origin_id), nodes.lookup(destination_id)
+        partial_routes = [route for route, freq in self.route_tracker.get_most_frequent_route_keys(top_n=20) if origin_key in route and destination_key in route]
         if partial_routes:
             # Heurística simple: elegir la ruta con mayor frecuencia que contiene ambos nodos
-            best_route = partial_routes[0]
-            self.optimization_report.append(f"Usando ruta parcial frecuente: {best_route}")
-            return best_route.split("→")
+            best_route = self.route_tracker.route_nodes(partial_routes[0])
+            self.optimization_report.append(f"Usando ruta parcial frecuente: {'→'.join(best_route)}")
+            return best_route
+
+        # 3. Calcular nueva ruta sobre el grafo (A* con coordenadas, Dijkstra sin ellas)
+        return self._calculate_new_route(origin_id, destination_id, battery_limit)
+
+    def _distance_scale(self, csr):
+        """Factor que convierte km en unidades de peso, memorizado por versión del grafo."""
+        version = self.graph.version()
+        if self._scale is None or self._scale[0] != version:
+            self._scale = (version, distance_scale(csr, self.coords) if self.coords else None)
+        return self._scale[1]
+
+    def _calculate_new_route(self, origin_id, destination_id, battery_limit=None):
+        """
+        Calcula una ruta nueva con A* sobre self.graph.
+
+        La heurística es la distancia haversine escalada a unidades de peso, que nunca
+        sobreestima el costo real; si falta alguna coordenada se usa Dijkstra.
+        Con battery_limit solo se aceptan rutas cuyo costo total no lo supere.
+        Devuelve la lista de nodos, o [] si no hay ruta factible.
+        """
+        if self.graph is None:
+            self.optimization_report.append("Sin grafo para calcular una ruta nueva")
+            return []
+        csr = self.graph.compile()
+        src, dst = csr.index_of(origin_id), csr.index_of(destination_id)
+        if src is None or dst is None:
+            self.optimization_report.append("Origen o destino no existe en el grafo")
+            return []
+
+        scale = self._distance_scale(csr)
+        heuristic = heuristic_to(csr, dst, self.coords, scale) if scale else None
+        max_cost = battery_limit if battery_limit is not None else float('inf')
+        cost, path = csr.a_star(src, dst, heuristic, max_cost)
+        if not path:
+            self.optimization_report.append("No existe ruta factible con la batería disponible")
+            return []
 
-        # 3. Calcular nueva ruta (ejemplo: camino más corto)
-        # Aquí se puede usar un algoritmo de búsqueda en el grafo (Dijkstra, A*, etc.)
-        # Para simplicidad, retornamos una lista vacía y registramos la acción
-        self.optimization_report.append("Calculando nueva ruta (no implementado)")
-        return []
+        algorithm = "A*" if heuristic is not None else "Dijkstra"
+        self.optimization_report.append(f"Calculando nueva ruta con {algorithm} (costo {cost})")
+        return [csr.vertex_id(i) for i in path]
 
     def analyze_route_patterns(self):
         """
         Analiza patrones en las rutas más frecuentes
         """
-        # Ejemplo: contar frecuencia de nodos en rutas frecuentes
-        node_visit_counts = {}
-        for route, freq in self.route_tracker.get_most_frequent_routes(top_n=50):
-            nodes = route.split("→")
-            for node in nodes:
-                node_visit_counts[node] = node_visit_counts.get(node, 0) + freq
+        # Frecuencia de nodos sobre todo el historial, mantenida incrementalmente por los agregados
+        node_visit_counts = self.aggregates.node_frequencies()
         self.optimization_report.append(f"Análisis de patrones: nodos visitados con frecuencia {node_visit_counts}")
         return node_visit_counts
 
@@ -1,57 +1,124 @@
-import .avl  # Se importa el módulo AVL que implementa el árbol AVL (equilibrado)
-from Hashmap import HashMap  # Se importa un HashMap personalizado
+from .avl import AVLTree, iter_inorder  # Árbol AVL de rutas, con índice por frecuencia
+from .Hashmap import HashMap  # Se importa un HashMap personalizado
+from .trie import RouteTrie, more_frequent  # Tries de rutas por nodo (prefijos y sufijos)
+from .routes import NodeTable  # Tabla de nombres de nodo internados como ids enteros
 
 class RouteTracker:
-    def __init__(self):
-        self.root = None                 # Raíz del árbol AVL que almacenará las rutas ordenadas
-        self.route_counts = {}           # Diccionario para contar la frecuencia de cada ruta (clave: ruta en string, valor: conteo)
+    def __init__(self, nodes=None):
+        self.nodes = nodes if nodes is not None else NodeTable()  # Tabla de ids de nodo (se puede compartir)
+        self.route_tree = AVLTree(self._route_to_str)  # Árbol AVL de rutas (tuplas de ids) con índice por frecuencia (empates alfabéticos)
+        self.route_counts = {}           # Diccionario para contar la frecuencia de cada ruta (clave: tupla de ids, valor: conteo)
         self.node_visits = {}            # Diccionario para contar la cantidad de visitas por cada nodo individual
         self.custom_hashmap = None       # Variable para almacenar un hashmap personalizado, se inicializa después
+        self.route_trie = RouteTrie()    # Trie de rutas por nodo: consultas por origen/prefijo
+        self.reverse_trie = RouteTrie()  # Trie de rutas invertidas: consultas por destino/sufijo
+        self.segment_best = {}           # (x, y) -> terminal más frecuente entre las rutas que pasan por x→y
+        self._subscribers = []           # Agregadores que reciben cada registro como on_route(ruta, delta)
+
+    def subscribe(self, aggregator):
+        """Suscribe un agregador a los registros de rutas, poniéndolo al día con el historial actual."""
+        for route, count in self.route_counts.items():
+            aggregator.on_route(route, count)
+        self._subscribers.append(aggregator)
+
+    def unsubscribe(self, aggregator):
+        self._subscribers.remove(aggregator)
 
     def _route_to_str(self, route):
-        # Convierte una lista de nodos de una ruta en una cadena separada por "→" para usar como clave
-        return "→".join(route)
+        # Convierte una ruta (tupla de ids) en una cadena "A→B→C"; solo se usa al reportar
+        return self.nodes.render(route)
+
+    def route_nodes(self, route):
+        """Devuelve la lista de nombres de nodo de una ruta (tupla de ids)."""
+        return self.nodes.names(route)
 
     def register_route(self, route_path, cost=None):
         """Registra una ruta en el sistema y actualiza las estadísticas de frecuencia y visitas por nodo."""
-        route_str = self._route_to_str(route_path)  # Convierte la ruta a string para usarla en el AVL y conteos
+        route = self.nodes.intern_route(route_path)  # La ruta se identifica por su tupla de ids de nodo
+
+        # El AVL crea la ruta o incrementa su frecuencia, y reubica la ruta en el índice por frecuencia
+        self.route_tree.insert_route(route)
+        self.route_counts[route] = self.route_counts.get(route, 0) + 1
 
-        if route_str not in self.route_counts:
-            # Si la ruta es nueva, se inserta en el AVL y se inicia el conteo en 1
-            self.root = AVL.insert(self.root, route_str)
-            self.route_counts[route_str] = 1
-        else:
-            # Si ya existe, solo se incrementa el conteo
-            self.route_counts[route_str] += 1
+        # Actualiza los tries y el mejor terminal de cada tramo x→y de la ruta, todo en O(largo de la ruta)
+        terminal = self.route_trie.insert(route, route)
+        self.reverse_trie.insert(route[::-1], route)
+        for segment in set(zip(route, route[1:])):
+            if more_frequent(terminal, self.segment_best.get(segment)):
+                self.segment_best[segment] = terminal
 
         # Actualiza el conteo de visitas para cada nodo que aparece en la ruta
+        # (y el hashmap personalizado, si ya fue creado, para que no quede desactualizado)
         for node in route_path:
             self.node_visits[node] = self.node_visits.get(node, 0) + 1
+            if self.custom_hashmap is not None:
+                self.custom_hashmap.put(node, self.node_visits[node])
+
+        # Publica el incremento a los agregadores suscritos
+        for aggregator in self._subscribers:
+            aggregator.on_route(route, 1)
 
     def get_most_frequent_routes(self, top_n=5):
         """Devuelve una lista con las top N rutas más frecuentes, ordenadas por frecuencia descendente."""
-        all_routes = self._in_order(self.root)  # Obtiene todas las rutas ordenadas del AVL
-        # Construye una lista de tuplas (ruta, frecuencia) usando el diccionario route_counts
-        freq_list = [(route, self.route_counts.get(route, 0)) for route in all_routes]
-        freq_list.sort(key=lambda x: x[1], reverse=True)  # Ordena por frecuencia de mayor a menor
-        return freq_list[:top_n]  # Devuelve solo las top N rutas
+        # Borde de reporte: las rutas se devuelven como texto "A→B→C"
+        return [(self._route_to_str(route), freq) for route, freq in self.get_most_frequent_route_keys(top_n)]
+
+    def get_most_frequent_route_keys(self, top_n=5):
+        """Como get_most_frequent_routes, pero con las rutas como tuplas de ids (sin armar texto)."""
+        # El índice ya está ordenado por frecuencia, solo se recorren las primeras N entradas
+        return self.route_tree.top_k(top_n)
+
+    def get_most_frequent_route(self, origin, destination):
+        """Ruta más frecuente que empieza en origin y termina en destination, como (tupla de ids, frecuencia), o None."""
+        origin_id, destination_id = self.nodes.lookup(origin), self.nodes.lookup(destination)
+        if origin_id is None or destination_id is None:
+            return None
+        return self.route_trie.best_route((origin_id,), destination_id)
+
+    def get_most_frequent_route_through(self, x, y):
+        """Ruta más frecuente que pasa por el tramo x→y, como (tupla de ids, frecuencia), o None."""
+        terminal = self.segment_best.get((self.nodes.lookup(x), self.nodes.lookup(y)))
+        return (terminal.route, terminal.count) if terminal else None
+
+    def get_routes_starting_with(self, prefix):
+        """Itera (tupla de ids, frecuencia) de las rutas cuyo comienzo es la lista de nodos prefix."""
+        prefix_ids = self.nodes.lookup_route(prefix)
+        return self.route_trie.iter_routes(prefix_ids) if prefix_ids is not None else iter(())
+
+    def get_routes_ending_with(self, suffix):
+        """Itera (tupla de ids, frecuencia) de las rutas cuyo final es la lista de nodos suffix."""
+        suffix_ids = self.nodes.lookup_route(suffix)
+        return self.reverse_trie.iter_routes(suffix_ids[::-1]) if suffix_ids is not None else iter(())
+
+    def get_route_rank(self, route_path):
+        """Devuelve la posición (desde 0) de la ruta en el orden por frecuencia, o None si no existe."""
+        route = self.nodes.lookup_route(route_path)
+        return self.route_tree.rank(route) if route is not None else None
 
     def _in_order(self, node):
         """Recorrido inorden del árbol AVL para obtener una lista ordenada de rutas."""
-        if node is None:
-            return []
-        # Recorre el subárbol izquierdo, el nodo actual y el subárbol derecho (orden ascendente)
-        return self._in_order(node.left) + [node.key] + self._in_order(node.right)
+        # Recorrido iterativo con pila explícita: sin copias de listas ni límite de recursión
+        return [n.key for n in iter_inorder(node)]
+
+    def iter_routes(self):
+        """Itera (tupla de ids, frecuencia) de todas las rutas, en el orden de sus ids."""
+        return self.route_tree.iter_inorder()
 
     def get_node_visits_stats(self):
         """Obtiene las estadísticas de visitas a nodos usando el hashmap personalizado."""
-        if not self.custom_hashmap:
+        if self.custom_hashmap is None:
             # Si el hashmap no fue inicializado, lanza un error para avisar al usuario
             raise Exception("HashMap no inicializado. Llama a create_custom_hashmap() primero.")
         return list(self.custom_hashmap.items())  # Devuelve la lista de pares (nodo, visitas) del hashmap
 
     def create_custom_hashmap(self, initial_size=10):
         """Crea un hashmap personalizado e inserta en él las visitas por nodo."""
-        self.custom_hashmap = HashMap(size=initial_size)  # Inicializa el hashmap con tamaño dado
-        for node, visits in self.node_visits.items():
-            self.custom_hashmap.put(node, visits)  # Inserta cada nodo con su conteo de visitas en el hashmap
\ No newline at end of file
+        # Reserva espacio para todos los nodos de una vez y los inserta en bloque
+        self.custom_hashmap = HashMap(size=max(initial_size, len(self.node_visits)))
+        self.custom_hashmap.update(self.node_visits)
+
+    def get_node_visit_count(self, node):
+        """Devuelve las visitas de un nodo en O(1) usando el hashmap personalizado."""
+        if self.custom_hashmap is None:
+            raise Exception("HashMap no inicializado. Llama a create_custom_hashmap() primero.")
+        return self.custom_hashmap.get(node, 0)
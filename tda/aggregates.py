@@ -0,0 +1,45 @@
+class RouteAggregates:
+    """Estadísticas de rutas actualizadas de forma incremental.
+
+    Se suscribe a un RouteTracker (RouteTracker.subscribe) y recibe cada
+    registro como on_route(ruta, delta). Cada actualización cuesta
+    O(largo de la ruta) y las lecturas son O(1), así no hace falta recalcular
+    todo el historial en cada consulta del optimizador.
+    """
+    def __init__(self, nodes):
+        self.nodes = nodes          # NodeTable compartida con el tracker
+        self.node_freq = {}         # id de nodo -> visitas (ponderadas por frecuencia de la ruta)
+        self.total_visits = 0
+        self.cooccurrence = {}      # (id menor, id mayor) -> veces que los nodos aparecen contiguos
+
+    def on_route(self, route, delta):
+        """Suma delta registros de la ruta (tupla de ids) a los agregados."""
+        node_freq = self.node_freq
+        for node_id in route:
+            node_freq[node_id] = node_freq.get(node_id, 0) + delta
+        self.total_visits += len(route) * delta
+
+        pairs = {(a, b) if a < b else (b, a) for a, b in zip(route, route[1:]) if a != b}
+        for pair in pairs:
+            self.cooccurrence[pair] = self.cooccurrence.get(pair, 0) + delta
+
+    def node_frequency(self, node):
+        node_id = self.nodes.lookup(node)
+        return self.node_freq.get(node_id, 0)
+
+    def node_score(self, node):
+        """Porcentaje de todas las visitas que corresponden al nodo."""
+        if not self.total_visits:
+            return 0
+        return self.node_frequency(node) / self.total_visits * 100
+
+    def cooccurrence_count(self, x, y):
+        """Veces que x e y aparecen contiguos en una ruta registrada (en cualquier sentido)."""
+        a, b = self.nodes.lookup(x), self.nodes.lookup(y)
+        if a is None or b is None:
+            return 0
+        return self.cooccurrence.get((a, b) if a < b else (b, a), 0)
+
+    def node_frequencies(self):
+        """Diccionario nombre de nodo -> visitas."""
+        return {self.nodes.name(node_id): count for node_id, count in self.node_freq.items()}
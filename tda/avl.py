@@ -1,3 +1,6 @@
+from itertools import islice
+
+
 class AVLNode:
     def __init__(self, key):
         self.key = key
@@ -5,31 +8,168 @@ class AVLNode:
         self.left = None
         self.right = None
         self.height = 1
+        self.size = 1
+        self.tie = key  # desempate entre rutas de igual frecuencia (ver AVLTree)
 
-class AVLTree:
-    def __init__(self):
+def iter_inorder(node):
+    """Recorre los nodos en orden con una pila explícita (sin recursión, perezoso)."""
+    stack = []
+    while stack or node:
+        if node:
+            stack.append(node)
+            node = node.left
+        else:
+            node = stack.pop()
+            yield node
+            node = node.right
+
+
+def iter_preorder(node):
+    """Recorre los nodos en preorden con una pila explícita."""
+    stack = [node] if node else []
+    while stack:
+        node = stack.pop()
+        yield node
+        if node.right:
+            stack.append(node.right)
+        if node.left:
+            stack.append(node.left)
+
+
+def iter_range(node, lo, hi):
+    """Recorre en orden los nodos con lo <= key <= hi, podando los subárboles fuera del rango."""
+    stack = []
+    while stack or node:
+        if node:
+            if node.key < lo:
+                node = node.right  # Todo el subárbol izquierdo queda por debajo de lo
+            else:
+                stack.append(node)
+                node = node.left
+        else:
+            node = stack.pop()
+            if node.key > hi:
+                return
+            yield node
+            node = node.right
+
+
+class _AVLBase:
+    def _get_height(self, node):
+        return node.height if node else 0
+
+    def _get_size(self, node):
+        return node.size if node else 0
+
+    def _update(self, node):
+        node.height = 1 + max(self._get_height(node.left), self._get_height(node.right))
+        node.size = 1 + self._get_size(node.left) + self._get_size(node.right)
+
+    def _get_balance(self, node):
+        return self._get_height(node.left) - self._get_height(node.right) if node else 0
+
+    def _rotate_left(self, z):
+        y = z.right
+        T2 = y.left
+        y.left = z
+        z.right = T2
+        self._update(z)
+        self._update(y)
+        return y
+
+    def _rotate_right(self, y):
+        x = y.left
+        T2 = x.right
+        x.right = y
+        y.left = T2
+        self._update(y)
+        self._update(x)
+        return x
+
+
+class AVLTree(_AVLBase):
+    def __init__(self, tie_key=None):
+        # tie_key(ruta) define el desempate entre rutas de igual frecuencia (por defecto, la ruta misma);
+        # se calcula una vez por ruta, al crear su nodo
         self.root = None
+        self.freq_index = FrequencyIndex()
+        self._tie_key = tie_key
+        self._last_node = None
 
     def insert_route(self, key):
         self.root = self._insert(self.root, key)
+        # Mantiene sincronizado el índice por frecuencia con el nodo recién insertado/incrementado
+        node = self._last_node
+        if node.freq > 1:
+            self.freq_index.remove(key, node.freq - 1, node.tie)
+        self.freq_index.insert(key, node.freq, node.tie)
+
+    def clear(self):
+        self.root = None
+        self.freq_index = FrequencyIndex()
 
     def get_routes_inorder(self):
-        result = []
-        self._inorder(self.root, result)
-        return result
+        return list(self.iter_inorder())
+
+    def iter_inorder(self):
+        """Itera (ruta, freq) en orden alfabético; se puede cortar en cualquier momento."""
+        for node in iter_inorder(self.root):
+            yield node.key, node.freq
+
+    def iter_preorder(self):
+        for node in iter_preorder(self.root):
+            yield node.key, node.freq
+
+    def iter_range(self, lo, hi):
+        """Itera (ruta, freq) para las rutas entre lo y hi (inclusive), en orden."""
+        for node in iter_range(self.root, lo, hi):
+            yield node.key, node.freq
+
+    def get_frequency(self, key):
+        node = self._find(key)
+        return node.freq if node else 0
+
+    def _find(self, key):
+        node = self.root
+        while node:
+            if key < node.key:
+                node = node.left
+            elif key > node.key:
+                node = node.right
+            else:
+                return node
+        return None
+
+    def top_k(self, k):
+        """Las k rutas más frecuentes como (ruta, freq), en O(log n + k)."""
+        return self.freq_index.top_k(k)
+
+    def rank(self, key):
+        """Posición (desde 0) de la ruta en el orden por frecuencia, o None si no existe."""
+        node = self._find(key)
+        return self.freq_index.rank(key, node.freq, node.tie) if node else None
+
+    def select(self, i):
+        """Ruta en la posición i del orden por frecuencia como (ruta, freq), o None."""
+        return self.freq_index.select(i)
 
     def _insert(self, node, key):
         if not node:
-            return AVLNode(key)
+            node = AVLNode(key)
+            if self._tie_key:
+                node.tie = self._tie_key(key)
+            self._last_node = node
+            return node
         if key < node.key:
             node.left = self._insert(node.left, key)
         elif key > node.key:
             node.right = self._insert(node.right, key)
         else:
             node.freq += 1
+            self._last_node = node
             return node
 
-        node.height = 1 + max(self._get_height(node.left), self._get_height(node.right))
+        self._update(node)
         balance = self._get_balance(node)
 
         if balance > 1 and key < node.left.key:
@@ -45,32 +185,89 @@ class AVLTree:
 
         return node
 
-    def _inorder(self, node, result):
-        if node:
-            self._inorder(node.left, result)
-            result.append((node.key, node.freq))
-            self._inorder(node.right, result)
 
-    def _get_height(self, node):
-        return node.height if node else 0
+class FrequencyIndex(_AVLBase):
+    """AVL aumentado con tamaños de subárbol, con claves (-freq, desempate, ruta).
 
-    def _get_balance(self, node):
-        return self._get_height(node.left) - self._get_height(node.right) if node else 0
+    El recorrido en orden da las rutas de mayor a menor frecuencia (empates
+    ordenados por el desempate, por defecto la ruta misma), así top_k, rank y
+    select no necesitan ordenar nada.
+    """
+    def __init__(self):
+        self.root = None
 
-    def _rotate_left(self, z):
-        y = z.right
-        T2 = y.left
-        y.left = z
-        z.right = T2
-        z.height = 1 + max(self._get_height(z.left), self._get_height(z.right))
-        y.height = 1 + max(self._get_height(y.left), self._get_height(y.right))
-        return y
+    def __len__(self):
+        return self._get_size(self.root)
 
-    def _rotate_right(self, y):
-        x = y.left
-        T2 = x.right
-        x.right = y
-        y.left = T2
-        y.height = 1 + max(self._get_height(y.left), self._get_height(y.right))
-        x.height = 1 + max(self._get_height(x.left), self._get_height(x.right))
-        return x
+    def insert(self, route, freq, tie=None):
+        self.root = self._insert_key(self.root, (-freq, route if tie is None else tie, route))
+
+    def remove(self, route, freq, tie=None):
+        self.root = self._delete(self.root, (-freq, route if tie is None else tie, route))
+
+    def top_k(self, k):
+        return [(node.key[2], -node.key[0]) for node in islice(iter_inorder(self.root), k)]
+
+    def rank(self, route, freq, tie=None):
+        key, node, rank = (-freq, route if tie is None else tie, route), self.root, 0
+        while node:
+            if key < node.key:
+                node = node.left
+            elif key > node.key:
+                rank += self._get_size(node.left) + 1
+                node = node.right
+            else:
+                return rank + self._get_size(node.left)
+        return None
+
+    def select(self, i):
+        node = self.root
+        while node:
+            left = self._get_size(node.left)
+            if i < left:
+                node = node.left
+            elif i == left:
+                return (node.key[2], -node.key[0])
+            else:
+                i -= left + 1
+                node = node.right
+        return None
+
+    def _insert_key(self, node, key):
+        if not node:
+            return AVLNode(key)
+        if key < node.key:
+            node.left = self._insert_key(node.left, key)
+        else:
+            node.right = self._insert_key(node.right, key)
+        return self._rebalance(node)
+
+    def _delete(self, node, key):
+        if not node:
+            return node
+        if key < node.key:
+            node.left = self._delete(node.left, key)
+        elif key > node.key:
+            node.right = self._delete(node.right, key)
+        else:
+            if not node.left or not node.right:
+                return node.left or node.right
+            succ = node.right
+            while succ.left:
+                succ = succ.left
+            node.key = succ.key
+            node.right = self._delete(node.right, succ.key)
+        return self._rebalance(node)
+
+    def _rebalance(self, node):
+        self._update(node)
+        balance = self._get_balance(node)
+        if balance > 1:
+            if self._get_balance(node.left) < 0:
+                node.left = self._rotate_left(node.left)
+            return self._rotate_right(node)
+        if balance < -1:
+            if self._get_balance(node.right) > 0:
+                node.right = self._rotate_right(node.right)
+            return self._rotate_left(node)
+        return node
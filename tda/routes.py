@@ -0,0 +1,44 @@
+class NodeTable:
+    """Tabla compartida de nombres de nodo internados como ids enteros pequeños.
+
+    Una ruta se guarda como tupla de ids (ver intern_route); los nombres y el
+    texto "A→B→C" solo se reconstruyen al reportar.
+    """
+    def __init__(self):
+        self._ids = {}     # nombre -> id
+        self._names = []   # id -> nombre
+
+    def __len__(self):
+        return len(self._names)
+
+    def intern(self, name):
+        node_id = self._ids.get(name)
+        if node_id is None:
+            node_id = self._ids[name] = len(self._names)
+            self._names.append(name)
+        return node_id
+
+    def lookup(self, name):
+        """Id del nodo, o None si nunca fue internado."""
+        return self._ids.get(name)
+
+    def name(self, node_id):
+        return self._names[node_id]
+
+    def intern_route(self, path):
+        """Convierte una lista de nombres en la tupla de ids que identifica la ruta."""
+        return tuple([self.intern(name) for name in path])
+
+    def lookup_route(self, path):
+        """Como intern_route pero sin crear ids; None si algún nodo es desconocido."""
+        ids = self._ids
+        try:
+            return tuple([ids[name] for name in path])
+        except KeyError:
+            return None
+
+    def names(self, route):
+        return [self._names[node_id] for node_id in route]
+
+    def render(self, route, sep="→"):
+        return sep.join([self._names[node_id] for node_id in route])
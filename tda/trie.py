@@ -0,0 +1,77 @@
+class TrieNode:
+    __slots__ = ('children', 'passes', 'count', 'route', 'best_end')
+
+    def __init__(self):
+        self.children = {}   # nodo del grafo -> TrieNode
+        self.passes = 0      # Registros de rutas que tienen este prefijo
+        self.count = 0       # Registros de la ruta que termina exactamente aquí
+        self.route = None    # Clave de la ruta que termina aquí (si hay alguna)
+        self.best_end = {}   # nodo final -> TrieNode terminal más frecuente del subárbol
+
+
+def more_frequent(a, b):
+    """True si el terminal a va antes que b en el orden (frecuencia desc, ruta asc)."""
+    return b is None or a.count > b.count or (a.count == b.count and a.route < b.route)
+
+
+class RouteTrie:
+    """Trie de rutas a nivel de nodo, con agregados de frecuencia por prefijo.
+
+    Cada nodo del trie guarda, por cada nodo final posible, el terminal más
+    frecuente de su subárbol. Como los conteos solo crecen, basta comparar la
+    ruta recién registrada con el mejor actual en cada nodo del camino, así
+    insert y best_route cuestan O(largo de la ruta).
+    """
+    def __init__(self):
+        self.root = TrieNode()
+
+    def insert(self, nodes, route):
+        """Registra una ocurrencia de la ruta (secuencia de nodos) y devuelve su terminal."""
+        path = [self.root]
+        current = self.root
+        current.passes += 1
+        for node in nodes:
+            child = current.children.get(node)
+            if child is None:
+                child = current.children[node] = TrieNode()
+            child.passes += 1
+            path.append(child)
+            current = child
+        current.count += 1
+        current.route = route
+
+        end = nodes[-1]
+        for trie_node in path:
+            if more_frequent(current, trie_node.best_end.get(end)):
+                trie_node.best_end[end] = current
+        return current
+
+    def find(self, prefix):
+        """Devuelve el TrieNode del prefijo, o None si ninguna ruta empieza así."""
+        current = self.root
+        for node in prefix:
+            current = current.children.get(node)
+            if current is None:
+                return None
+        return current
+
+    def count(self, nodes):
+        """Veces que se registró exactamente esta ruta."""
+        trie_node = self.find(nodes)
+        return trie_node.count if trie_node else 0
+
+    def best_route(self, prefix, end):
+        """Ruta más frecuente que empieza con prefix y termina en end, como (ruta, frecuencia)."""
+        trie_node = self.find(prefix)
+        best = trie_node.best_end.get(end) if trie_node else None
+        return (best.route, best.count) if best else None
+
+    def iter_routes(self, prefix=()):
+        """Itera (ruta, frecuencia) de todas las rutas que empiezan con prefix."""
+        start = self.find(prefix)
+        stack = [start] if start else []
+        while stack:
+            trie_node = stack.pop()
+            if trie_node.count:
+                yield trie_node.route, trie_node.count
+            stack.extend(trie_node.children.values())